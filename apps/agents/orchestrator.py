@@ -1,14 +1,24 @@
 from smolagents import CodeAgent, InferenceClientModel, OpenAIServerModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import hashlib
+import ast
 import logging
 import os
-import mimetypes
-import glob
+import re
+import stat
+import threading
 import time
-from pathlib import Path
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import singledispatchmethod
 from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
 from decouple import config
 
+from apps.agents.cache import ExactCache
+from apps.agents.temp_tracker import TempDirTracker, TempRecording
+
 # Import all the SmolAgents tools
 from apps.agents.tools.parse_pdf_tool import ParsePDFTool
 from apps.agents.tools.parse_excel_tool import ParseExcelTool
@@ -20,13 +30,352 @@ from apps.agents.tools.save_artifact_tool import SaveArtifactTool
 # from apps.agents.tools.excel_generator_tool import ExcelGeneratorTool
 from apps.agents.tools.excel_generator import ExcelGeneratorTool
 from apps.agents.tools.word_generator import SimpleWordGeneratorTool
+from apps.agents.tools.parallel_tools_tool import ParallelToolsTool
+
+# Preview generators depend on optional document libraries (mammoth, pandas)
+try:
+    from apps.agents.tools.word_preview import WordPreviewGenerator
+except ImportError:
+    WordPreviewGenerator = None
+try:
+    from apps.agents.tools.excel_preview import ExcelPreviewGenerator
+except ImportError:
+    ExcelPreviewGenerator = None
 
-# Import Django models (lazy import to avoid circular imports)
+# Import Django models; this module is only imported once the app registry is ready
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Func, JSONField, Value
+from django.core.cache import cache
 from django.utils import timezone
 from django.conf import settings
+from apps.chat.mime import EXT_MIME, mime_for_suffix
+from apps.chat.models import Artifact, Message
 
 logger = logging.getLogger(__name__)
 
+# File extensions tracked in temp/ snapshots to detect generated artifacts
+_ARTIFACT_EXTENSIONS = frozenset({
+    '.xlsx', '.docx', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.pdf', '.txt', '.csv'
+})
+
+# Snapshots with at least this many files stat them on a thread pool
+_SNAPSHOT_PARALLEL_THRESHOLD = 32
+_SNAPSHOT_MAX_WORKERS = 8
+
+# Filesystem-event tracking of temp/ (watchdog); without it every run diffs
+# two full snapshots of the directory
+_TEMP_WATCHER_ENABLED = getattr(settings, 'AGENT_TEMP_WATCHER', True)
+_TEMP_TRACKER = TempDirTracker(os.path.join(os.getcwd(), 'temp'), _ARTIFACT_EXTENSIONS)
+
+# Canonical temp/ location; the process working directory is fixed after startup
+_TEMP_DIR_ABS = os.path.normcase(os.path.realpath(os.path.join(os.getcwd(), 'temp')))
+
+def _is_in_temp_dir(file_path: str) -> bool:
+    """Whether a path resolves (symlinks included) to a location inside temp/"""
+    return os.path.normcase(os.path.realpath(file_path)).startswith(_TEMP_DIR_ABS + os.sep)
+
+def _get_mtime(entry: os.DirEntry):
+    """Return the modification time of a directory entry, or None if it cannot be stat'ed"""
+    try:
+        # Cached on the entry; on Windows it comes with the directory listing
+        return entry.stat().st_mtime
+    except OSError:
+        return None
+
+# Rows per INSERT when registering artifacts; one batch covers any realistic run
+_ARTIFACT_BULK_BATCH_SIZE = 500
+
+# Office documents that get an HTML preview when registered as artifacts
+_PREVIEW_EXTENSIONS = frozenset({'.docx', '.xlsx', '.xls'})
+_PREVIEW_MIME_TYPES = frozenset(EXT_MIME[suffix] for suffix in _PREVIEW_EXTENSIONS)
+
+# Upper bound on documents previewed concurrently during registration
+_PREVIEW_MAX_WORKERS = 8
+
+# Patterns used to find generated files in CodeAgent output:
+# (regex with exactly one capture group, artifact type, default name)
+_CODE_OUTPUT_PATTERNS = (
+    # Function call patterns with file paths
+    (r'excel_generator\([^)]*filename=["\']([^"\']+)["\']', 'file', 'Generated Excel File'),
+    (r'simple_word_generator\([^)]*filename=["\']([^"\']+)["\']', 'file', 'Generated Word Document'),
+    (r'generate_chart\([^)]*filename=["\']([^"\']+)["\']', 'chart', 'Generated Chart'),
+    
+    # Direct file path mentions
+    (r'saved to[:\s]+([^\s\n]+\.xlsx)', 'file', 'Excel File'),
+    (r'saved to[:\s]+([^\s\n]+\.docx)', 'file', 'Word Document'),
+    (r'saved to[:\s]+([^\s\n]+\.png)', 'chart', 'Chart Image'),
+    (r'created[:\s]+([^\s\n]+\.xlsx)', 'file', 'Excel File'),
+    (r'created[:\s]+([^\s\n]+\.docx)', 'file', 'Word Document'),
+    (r'generated[:\s]+([^\s\n]+\.png)', 'chart', 'Chart Image'),
+    
+    # Temp directory patterns
+    (r'(temp[/\\][\w\\/.-]+\.xlsx)', 'file', 'Generated Excel File'),
+    (r'(temp[/\\][\w\\/.-]+\.docx)', 'file', 'Generated Word Document'),
+    (r'(temp[/\\][\w\\/.-]+\.png)', 'chart', 'Generated Chart'),
+    (r'(temp[/\\][\w\\/.-]+\.jpg)', 'chart', 'Generated Chart'),
+    (r'(temp[/\\][\w\\/.-]+\.svg)', 'chart', 'Generated Chart'),
+    (r'(temp[/\\][\w\\/.-]+\.webp)', 'chart', 'Generated Chart'),
+)
+
+# All code output patterns fused into one alternation so the output is
+# scanned once. Each alternative has a single capture group, so the index of
+# the group that matched (match.lastindex) identifies the pattern.
+_CODE_OUTPUT_RE = re.compile(
+    '|'.join(f'(?:{pattern})' for pattern, _, _ in _CODE_OUTPUT_PATTERNS),
+    re.IGNORECASE
+)
+_CODE_OUTPUT_GROUP_META = {
+    group_index: (file_type, default_name)
+    for group_index, (_, file_type, default_name) in enumerate(_CODE_OUTPUT_PATTERNS, 1)
+}
+
+# Dictionary literals carrying preview HTML in a tool result string
+_PREVIEW_DICT_RE = re.compile(r'\{[^{}]*preview_html[^{}]*\}', re.DOTALL)
+
+def _find_embedded_preview_html(agent_result) -> Optional[str]:
+    """
+    Return the first preview_html found in a dictionary literal of a result
+    
+    Every Office artifact of a run would look in the same (possibly very
+    large) result string, so registration calls this once per run.
+    """
+    if not (agent_result and isinstance(agent_result, str) and 'preview_html' in agent_result):
+        return None
+    
+    # Look for dictionary representations in the result string
+    for match in _PREVIEW_DICT_RE.findall(agent_result):
+        try:
+            # Try to safely evaluate the dictionary string
+            result_dict = ast.literal_eval(match)
+            if isinstance(result_dict, dict) and result_dict.get('preview_html'):
+                return result_dict['preview_html']
+        except (ValueError, SyntaxError):
+            continue
+    return None
+
+# Every code output pattern needs one of these (lowercase) literals to match
+_CODE_OUTPUT_NEEDLES = ('filename=', '.xlsx', '.docx', '.png', '.jpg', '.svg', '.webp')
+
+# Shortest text any code output pattern can match (e.g. "temp/a.png")
+_MIN_FILE_MENTION_LENGTH = 10
+
+# Success messages returned by our tools: (pattern, artifact type, default name)
+_RESULT_MESSAGE_PATTERNS = (
+    # Chart generator
+    (r'Chart generated successfully: (.+)', 'chart', 'Generated Chart'),
+    # Excel generator
+    (r'Excel file created successfully: (.+)', 'file', 'Generated Excel File'),
+    (r'Excel file saved to: (.+)', 'file', 'Generated Excel File'),
+    # Word generator
+    (r'Word document created successfully: (.+)', 'file', 'Generated Word Document'),
+    (r'Document saved to: (.+)', 'file', 'Generated Document'),
+    # Save artifact tool
+    (r'Artifact saved successfully: (.+)', 'artifact', 'Generated Artifact'),
+    # Parsing tool patterns
+    (r'Excel parsed successfully\. Generated (\d+) preview file\(s\)\.', 'message', 'Excel Preview'),
+    (r'Word document parsed successfully\. Generated (\d+) preview file\(s\)\.', 'message', 'Word Preview'),
+)
+
+# The success messages never overlap each other, so like the code output
+# patterns they are fused into one alternation dispatched on match.lastindex
+_RESULT_MESSAGE_RE = re.compile(
+    '|'.join(f'(?:{pattern})' for pattern, _, _ in _RESULT_MESSAGE_PATTERNS),
+    re.IGNORECASE
+)
+_RESULT_MESSAGE_GROUP_META = {
+    group_index: (file_type, default_name)
+    for group_index, (_, file_type, default_name) in enumerate(_RESULT_MESSAGE_PATTERNS, 1)
+}
+
+# Every success message contains one of these (lowercase) literals
+_RESULT_MESSAGE_NEEDLES = ('successfully', 'saved to: ')
+
+# Generic temp/ paths. These overlap the success messages (and each other),
+# so they keep their own scan: (compiled regex, artifact type, default name,
+# lowercase literal the text must contain)
+_RESULT_PATH_PATTERNS = tuple(
+    (re.compile(pattern, re.IGNORECASE), file_type, default_name, needle)
+    for pattern, file_type, default_name, needle in [
+        (r'(temp[/\\][\w\\/.-]+\.\w+)', 'file', 'Generated File', 'temp'),
+        (r'(temp[/\\]previews[/\\][\w\\/.-]+\.\w+)', 'preview_file', 'Preview File', 'previews'),
+    ]
+)
+
+# Agent output fragments (lowercase) showing the agent itself failed to
+# produce runnable code; any of them marks the run as failed
+_CRITICAL_ERR_RE = re.compile('|'.join(map(re.escape, (
+    'error in code parsing',
+    'invalid code snippet',
+    'regex pattern',
+    'was not found in it',
+    'make sure to include code',
+))))
+
+# Words near a file mention showing the tool call that wrote it succeeded
+_POS_INDICATOR_RE = re.compile(r'successfully|created|generated|saved')
+
+# Static instructions handed to the agent as part of its system prompt.
+# Keep this byte-identical across calls: it forms the cacheable prompt prefix
+# for OpenRouter/Anthropic prompt caching, so anything that varies per request
+# (documents, history, the instruction itself) must go in the task prompt.
+STATIC_SYSTEM_PREAMBLE = """You are the assistant of a document processing chatbot.
+The user uploads PDF, Excel and Word documents and asks questions about them or
+asks for new files (Excel workbooks, Word documents, charts) to be produced.
+- Use the parsing tools to read the documents listed under "Available Documents".
+- Use the generator tools to create files; generated files are stored under temp/.
+- Always mention the path of every file you create in your final answer.
+- Answer in the language used by the user."""
+
+# Completion budget per agent run: a base allowance plus roughly one token per
+# four prompt characters, capped at the previous fixed ceiling
+_BASE_COMPLETION_TOKENS = 8192
+_MAX_COMPLETION_TOKENS = 180000
+
+def _completion_token_budget(prompt: str) -> int:
+    """Approximate the max_tokens to request for a prompt without tokenizing it"""
+    return min(_MAX_COMPLETION_TOKENS, _BASE_COMPLETION_TOKENS + len(prompt) // 4)
+
+# OpenRouter model clients shared by every orchestrator, keyed by model name
+# and API key digest; each one owns a keep-alive HTTPS connection pool
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+_MODEL_MAX_KEEPALIVE_CONNECTIONS = 20
+
+def _get_cached_model(model_name: str, api_key: str) -> OpenAIServerModel:
+    """Return the OpenRouter model client for a model, created once per process"""
+    # Key on a digest so the API key does not sit in the cache keys in plain text
+    cache_key = (model_name, hashlib.sha256(api_key.encode('utf-8')).hexdigest())
+    model = _MODELS.get(cache_key)
+    if model is None:
+        with _MODELS_LOCK:
+            model = _MODELS.get(cache_key)
+            if model is None:
+                import httpx
+                import openai
+                
+                # max_tokens is deliberately not fixed here: model kwargs override
+                # per-call values, and the budget is chosen per request by
+                # _TokenBudgetModel. The pool is sized explicitly so concurrent
+                # requests keep reusing warm connections
+                model = _MODELS[cache_key] = OpenAIServerModel(
+                    api_base="https://openrouter.ai/api/v1",
+                    model_id=model_name,
+                    api_key=api_key,
+                    client_kwargs={
+                        'http_client': openai.DefaultHttpxClient(
+                            limits=httpx.Limits(max_keepalive_connections=_MODEL_MAX_KEEPALIVE_CONNECTIONS)
+                        )
+                    },
+                )
+    return model
+
+def build_memory_pack(documents: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    Render the document context block of the prompt
+    
+    Documents are sorted by name (then id) so the block is byte-identical for
+    the same set of documents, whatever order the context was built in.
+    Returns the text and a short version hash of it ('' for no documents).
+    """
+    if not documents:
+        return '', ''
+    
+    lines = [
+        f"- {doc['name']} ({doc['type']}): {doc['summary']}"
+        for doc in sorted(documents, key=lambda d: (d.get('name', ''), str(d.get('id', ''))))
+    ]
+    body = '\n'.join(lines)
+    version_hash = hashlib.md5(body.encode('utf-8'), usedforsecurity=False).hexdigest()[:12]
+    return f"=== Available Documents (v{version_hash}) ===\n{body}", version_hash
+
+# Responses of recent agent runs, keyed on the full prompt; off unless
+# AGENT_RESULT_CACHE is set
+_RESULT_CACHE_ENABLED = getattr(settings, 'AGENT_RESULT_CACHE', False)
+_RESULT_CACHE = ExactCache(maxsize=128, ttl=300)
+
+# Number of previous messages included in the prompt
+_MAX_HISTORY = getattr(settings, 'MAX_CONVERSATION_HISTORY', 10)
+
+# Approximate prompt tokens (len // 4, as for the completion budget) the
+# conversation history may use; older messages beyond it are dropped
+_HISTORY_TOKEN_BUDGET = getattr(settings, 'CONVERSATION_HISTORY_TOKEN_BUDGET', 2000)
+
+def _fit_history_to_budget(history_lines: List[str], token_budget: int = _HISTORY_TOKEN_BUDGET) -> List[str]:
+    """
+    Keep the most recent history lines that fit in the token budget
+
+    Lines are packed newest first so the latest exchange always survives;
+    dropped lines are replaced by a single marker so the agent knows the
+    conversation goes back further.
+    """
+    kept = []
+    used = 0
+    for line in reversed(history_lines):
+        cost = len(line) // 4 + 1
+        if kept and used + cost > token_budget:
+            break
+        kept.append(line)
+        used += cost
+    kept.reverse()
+    
+    omitted = len(history_lines) - len(kept)
+    if omitted:
+        kept.insert(0, f"[{omitted} earlier messages omitted]")
+    return kept
+
+# Seconds a conversation's formatted history stays cached between turns
+_HISTORY_CACHE_TTL = 30
+
+def _history_cache_key(conversation_id) -> str:
+    return f"orchestrator:history:{conversation_id}"
+
+def invalidate_history(conversation_id) -> None:
+    """Drop the cached prompt history of a conversation"""
+    cache.delete(_history_cache_key(conversation_id))
+
+class _TokenBudgetModel:
+    """Delegate to a shared model, requesting max_tokens sized for the current prompt"""
+    
+    def __init__(self, model: OpenAIServerModel):
+        self._model = model
+        self.max_tokens = _MAX_COMPLETION_TOKENS
+    
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+    
+    def generate(self, *args, **kwargs):
+        kwargs.setdefault('max_tokens', self.max_tokens)
+        return self._model.generate(*args, **kwargs)
+    
+    def generate_stream(self, *args, **kwargs):
+        kwargs.setdefault('max_tokens', self.max_tokens)
+        return self._model.generate_stream(*args, **kwargs)
+    
+    def __call__(self, *args, **kwargs):
+        return self.generate(*args, **kwargs)
+
+# Stateless tool instances shared by every orchestrator, built on first use
+_SHARED_TOOLS = None
+_SHARED_TOOLS_LOCK = threading.Lock()
+
+def _get_shared_tools() -> tuple:
+    """Return the stateless tool instances shared by every orchestrator"""
+    global _SHARED_TOOLS
+    if _SHARED_TOOLS is None:
+        # Concurrent first requests must not each build (and import) the tools
+        with _SHARED_TOOLS_LOCK:
+            if _SHARED_TOOLS is None:
+                _SHARED_TOOLS = (
+                    ModifyExcelTool(),
+                    # ModifyWordTool(),
+                    SimpleWordGeneratorTool(),
+                    GenerateChartTool(),
+                    SaveArtifactTool(),
+                    ExcelGeneratorTool()
+                    # ExcelGeneratorTool()
+                )
+    return _SHARED_TOOLS
+
 class ChatbotOrchestrator:
     """Orchestrate SmolAgents for document processing"""
     
@@ -36,24 +385,27 @@ class ChatbotOrchestrator:
         if not api_key:
             raise ValueError("OPENROUTER_API_KEY environment variable is required")
         
-        # Initialize OpenRouter model (OpenAI-compatible API)
-        self.model = OpenAIServerModel(
-            api_base="https://openrouter.ai/api/v1",
-            model_id=model_name,
-            api_key=api_key,
-            max_tokens=180000,  # Set max tokens to 262144 for better performance
-        )
+        # Initialize OpenRouter model (OpenAI-compatible API), shared across orchestrators
+        self.model = _TokenBudgetModel(_get_cached_model(model_name, api_key))
         
         # Store session_id
         self.session_id = session_id
         
+        # The process working directory is fixed after startup; resolve it once
+        self._cwd = os.getcwd()
+        self._temp_dir = os.path.join(self._cwd, 'temp')
+        # stat() results of the agent result being processed (see _cached_stat)
+        self._stat_cache = {}
+        
         # Create tool instances directly
         self.tools = self._create_tools(session_id=session_id)
+        self._tools_signature = ','.join(tool.name for tool in self.tools)
         
         # Initialize agent with tools
         self.agent = CodeAgent(
             tools=self.tools,
             model=self.model,
+            instructions=STATIC_SYSTEM_PREAMBLE,
             max_steps=10,
             verbosity_level=1,
             additional_authorized_imports=[
@@ -64,18 +416,21 @@ class ChatbotOrchestrator:
     
     def _create_tools(self, session_id: str = None) -> List:
         """Create instances of all SmolAgents tools"""
-        return [
+        # Parsing tools resolve files through the session storage, so they are
+        # built per orchestrator; the generator tools hold no state and are shared
+        tools = [
             ParsePDFTool(session_id=session_id),
             ParseExcelTool(session_id=session_id),
             ParseWordTool(session_id=session_id),
-            ModifyExcelTool(),
-            # ModifyWordTool(),
-            SimpleWordGeneratorTool(),
-            GenerateChartTool(),
-            SaveArtifactTool(),
-            ExcelGeneratorTool()
-            # ExcelGeneratorTool()
+            *_get_shared_tools()
         ]
+        
+        # Let the agent batch independent calls when concurrency is enabled
+        concurrency_limit = getattr(settings, 'TOOL_CONCURRENCY_LIMIT', 1)
+        if concurrency_limit > 1:
+            tools.append(ParallelToolsTool(tools=tools, max_workers=concurrency_limit))
+        
+        return tools
     
     def process_request(
         self,
@@ -91,90 +446,26 @@ class ChatbotOrchestrator:
             # Build prompt with context and conversation history
             prompt = self._build_prompt(instruction, context, conversation_id)
             
-            # Track temp directory state before agent execution
-            temp_dir = os.path.join(os.getcwd(), 'temp')
-            files_before = self._get_temp_files_snapshot(temp_dir)
+            # Identical requests reuse the previous answer
+            cache_key = self._result_cache_key(prompt) if _RESULT_CACHE_ENABLED else None
+            cached_response = self._get_cached_result(cache_key)
+            if cached_response is not None:
+                return cached_response
+            
+            # Track temp directory changes during agent execution
+            temp_baseline = self._begin_temp_tracking()
             
             # Run agent with better error handling
             try:
                 logger.debug(f"Running CodeAgent with prompt length: {len(prompt)}")
+                self.model.max_tokens = _completion_token_budget(prompt)
                 result = self.agent.run(prompt)
-                logger.debug(f"CodeAgent result type: {type(result)}")
-                logger.debug(f"CodeAgent result preview: {str(result)[:500]}...")
-                
-                # Validate result
-                if result is None:
-                    logger.warning("Agent returned None result")
-                    # Cleanup any orphaned files from failed execution
-                    self._cleanup_orphaned_artifacts(files_before, self._get_temp_files_snapshot(temp_dir))
-                    return {
-                        'status': 'error',
-                        'error': 'Agent returned no response'
-                    }
-                
-                # Convert result to string if it's not already
-                result_str = str(result) if result is not None else "No response generated"
-                
-                # Track temp directory state after agent execution
-                files_after = self._get_temp_files_snapshot(temp_dir)
-                
-                # Extract artifacts from multiple sources first
-                artifacts = self._extract_artifacts_enhanced(result, files_before, files_after)
-                
-                # Validate tool execution status using the artifacts as evidence
-                tool_execution_successful = self._validate_tool_execution_status(result_str, artifacts)
-                
-                # Only filter artifacts if we detect actual execution failures
-                # (not just lack of success keywords)
-                if not tool_execution_successful:
-                    logger.warning("Tool execution failure detected - filtering artifacts")
-                    artifacts = self._filter_artifacts_for_failed_tools(artifacts, result_str)
-                
-                # Create Artifact database records if message is provided and artifacts are valid
-                if message and artifacts:
-                    self._create_artifact_records(artifacts, message, result)
-                elif not tool_execution_successful:
-                    # Cleanup orphaned files from failed tools
-                    self._cleanup_orphaned_artifacts(files_before, files_after)
-                
-                # Process results
-                return {
-                    'status': 'success',
-                    'result': result_str,
-                    'artifacts': artifacts,
-                    'tool_execution_successful': tool_execution_successful
-                }
-                
-            except AttributeError as attr_error:
-                # Handle token counting errors specifically
-                if "prompt_tokens" in str(attr_error):
-                    logger.warning(f"Token counting error (likely due to malformed response): {str(attr_error)}")
-                    return {
-                        'status': 'error',
-                        'error': 'Response processing error - please try again with a simpler request'
-                    }
-                else:
-                    raise attr_error
-            except KeyError as key_error:
-                # Handle tool parsing errors specifically
-                if "tool_name_key" in str(key_error) or "'name' not found" in str(key_error):
-                    logger.warning(f"Tool parsing error (likely due to malformed tool response): {str(key_error)}")
-                    return {
-                        'status': 'error',
-                        'error': 'Tool response formatting error - the tool returned an unexpected format. Please try rephrasing your request.'
-                    }
-                else:
-                    raise key_error
-            except Exception as parse_error:
-                # Handle any other parsing errors
-                if "tool call" in str(parse_error).lower() or "parsing" in str(parse_error).lower():
-                    logger.warning(f"Tool call parsing error: {str(parse_error)}")
-                    return {
-                        'status': 'error',
-                        'error': 'Response parsing error - please try rephrasing your request with simpler instructions.'
-                    }
-                else:
-                    raise parse_error
+                response = self._process_agent_result(result, temp_baseline, message)
+                self._cache_result(cache_key, response)
+                return response
+            except Exception as run_error:
+                self._abort_temp_tracking(temp_baseline)
+                return self._handle_agent_error(run_error)
             
         except Exception as e:
             logger.error(f"Error in orchestrator: {str(e)}", exc_info=True)
@@ -183,10 +474,198 @@ class ChatbotOrchestrator:
                 'error': str(e)
             }
     
+    async def aprocess_request(
+        self,
+        instruction: str,
+        context: Dict[str, Any],
+        session_id: str,
+        message=None,
+        conversation_id: str = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of process_request for ASGI views
+        
+        The blocking work is offloaded so the event loop can keep serving
+        other requests during the LLM round-trips. Steps touching the ORM go
+        through sync_to_async, which runs them on Django's thread-sensitive
+        executor where database connections are managed; the filesystem
+        snapshot and the agent run use plain worker threads.
+        """
+        
+        try:
+            # Prompt building and starting temp/ tracking are independent. Both
+            # are awaited so a recording started alongside a failed prompt is
+            # stopped instead of collecting events for the rest of the process
+            prompt, temp_baseline = await asyncio.gather(
+                sync_to_async(self._build_prompt)(instruction, context, conversation_id),
+                asyncio.to_thread(self._begin_temp_tracking),
+                return_exceptions=True,
+            )
+            if isinstance(prompt, BaseException):
+                if not isinstance(temp_baseline, BaseException):
+                    self._abort_temp_tracking(temp_baseline)
+                raise prompt
+            if isinstance(temp_baseline, BaseException):
+                raise temp_baseline
+            
+            # Identical requests reuse the previous answer
+            cache_key = self._result_cache_key(prompt) if _RESULT_CACHE_ENABLED else None
+            cached_response = self._get_cached_result(cache_key)
+            if cached_response is not None:
+                self._abort_temp_tracking(temp_baseline)
+                return cached_response
+            
+            try:
+                logger.debug(f"Running CodeAgent with prompt length: {len(prompt)}")
+                self.model.max_tokens = _completion_token_budget(prompt)
+                result = await asyncio.to_thread(self.agent.run, prompt)
+                response = await sync_to_async(self._process_agent_result)(result, temp_baseline, message)
+                self._cache_result(cache_key, response)
+                return response
+            except Exception as run_error:
+                self._abort_temp_tracking(temp_baseline)
+                return self._handle_agent_error(run_error)
+            
+        except Exception as e:
+            logger.error(f"Error in orchestrator: {str(e)}", exc_info=True)
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    def _result_cache_key(self, prompt: str) -> str:
+        """Key a prompt by the model, tools and session that would answer it"""
+        return _RESULT_CACHE.make_key(prompt, self.model.model_id, self._tools_signature, self.session_id or '')
+    
+    def _get_cached_result(self, cache_key: Optional[str]) -> Dict[str, Any]:
+        """
+        Return a cached response whose artifacts are all still valid
+        
+        The artifacts stay registered on the message of the original run;
+        they are not attached to the message of the repeated request.
+        """
+        if cache_key is None:
+            return None
+        
+        cached_response = _RESULT_CACHE.get(cache_key)
+        if cached_response is None:
+            return None
+        
+        artifacts = [artifact.copy() for artifact in cached_response.get('artifacts', [])]
+        self._stat_cache = {}
+        if not all(self._validate_artifact_file(artifact['path']) for artifact in artifacts):
+            # Generated files were cleaned up since; the request has to be rerun
+            _RESULT_CACHE.delete(cache_key)
+            return None
+        
+        logger.info(f"Serving agent response from cache ({len(artifacts)} artifacts)")
+        return {**cached_response, 'artifacts': artifacts}
+    
+    def _cache_result(self, cache_key: Optional[str], response: Dict[str, Any]) -> None:
+        """Remember fully successful responses for identical follow-up requests"""
+        if cache_key is not None and response.get('status') == 'success' and response.get('tool_execution_successful'):
+            _RESULT_CACHE.set(cache_key, response)
+    
+    def _process_agent_result(self, result: Any, temp_baseline, message=None) -> Dict[str, Any]:
+        """Detect, validate and register the artifacts produced by an agent run"""
+        # Track temp directory state after agent execution
+        files_before, files_after = self._end_temp_tracking(temp_baseline)
+        self._stat_cache = {}
+        
+        # str() of a large result is costly; only build the preview when it is logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"CodeAgent result type: {type(result)}")
+            logger.debug(f"CodeAgent result preview: {str(result)[:500]}...")
+        
+        # Validate result
+        if result is None:
+            logger.warning("Agent returned None result")
+            # Cleanup any orphaned files from failed execution
+            self._cleanup_orphaned_artifacts(files_before, files_after)
+            return {
+                'status': 'error',
+                'error': 'Agent returned no response'
+            }
+        
+        # Convert result to string if it's not already
+        result_str = str(result) if result is not None else "No response generated"
+        
+        # Extract artifacts from multiple sources first
+        artifacts = self._extract_artifacts_enhanced(result, files_before, files_after)
+        
+        # Validate tool execution status using the artifacts as evidence
+        tool_execution_successful = self._validate_tool_execution_status(result_str, artifacts)
+        
+        # Only filter artifacts if we detect actual execution failures
+        # (not just lack of success keywords)
+        if not tool_execution_successful:
+            logger.warning("Tool execution failure detected - filtering artifacts")
+            artifacts = self._filter_artifacts_for_failed_tools(artifacts, result_str)
+        
+        # Create Artifact database records if message is provided and artifacts are valid
+        if message and artifacts:
+            self._create_artifact_records(artifacts, message, result)
+        elif not tool_execution_successful:
+            # Cleanup orphaned files from failed tools
+            self._cleanup_orphaned_artifacts(files_before, files_after)
+        
+        # Process results
+        return {
+            'status': 'success',
+            'result': result_str,
+            'artifacts': artifacts,
+            'tool_execution_successful': tool_execution_successful
+        }
+    
+    def _handle_agent_error(self, error: Exception) -> Dict[str, Any]:
+        """Turn known agent/tool parsing failures into user-facing errors, re-raise the rest"""
+        if isinstance(error, AttributeError):
+            # Handle token counting errors specifically
+            if "prompt_tokens" in str(error):
+                logger.warning(f"Token counting error (likely due to malformed response): {str(error)}")
+                return {
+                    'status': 'error',
+                    'error': 'Response processing error - please try again with a simpler request'
+                }
+            raise error
+        
+        if isinstance(error, KeyError):
+            # Handle tool parsing errors specifically
+            if "tool_name_key" in str(error) or "'name' not found" in str(error):
+                logger.warning(f"Tool parsing error (likely due to malformed tool response): {str(error)}")
+                return {
+                    'status': 'error',
+                    'error': 'Tool response formatting error - the tool returned an unexpected format. Please try rephrasing your request.'
+                }
+            raise error
+        
+        # Handle any other parsing errors
+        if "tool call" in str(error).lower() or "parsing" in str(error).lower():
+            logger.warning(f"Tool call parsing error: {str(error)}")
+            return {
+                'status': 'error',
+                'error': 'Response parsing error - please try rephrasing your request with simpler instructions.'
+            }
+        raise error
+    
     def _build_prompt(self, instruction: str, context: Dict[str, Any], conversation_id: str = None) -> str:
-        """Build prompt with document context and conversation history"""
+        """
+        Build prompt with document context and conversation history
+        
+        Sections are emitted from the most stable to the most volatile so that
+        consecutive turns share the longest possible prefix (provider prompt
+        caching): the static instructions live in the system prompt, then the
+        deterministic document pack, then the sliding conversation history,
+        then the current request last.
+        """
         prompt_parts = []
         
+        # Add document context; the pack is byte-identical for the same documents
+        memory_pack, _ = build_memory_pack(context.get('documents') or [])
+        if memory_pack:
+            prompt_parts.append(memory_pack)
+            prompt_parts.append("")  # Empty line separator
+        
         # Add conversation history
         conversation_history = self._get_conversation_history(conversation_id)
         if conversation_history:
@@ -194,13 +673,6 @@ class ChatbotOrchestrator:
             prompt_parts.extend(conversation_history)
             prompt_parts.append("")  # Empty line separator
         
-        # Add document context
-        if context.get('documents'):
-            prompt_parts.append("=== Available Documents ===")
-            for doc in context['documents']:
-                prompt_parts.append(f"- {doc['name']} ({doc['type']}): {doc['summary']}")
-            prompt_parts.append("")  # Empty line separator
-        
         # Add current instruction
         prompt_parts.append("=== Current Request ===")
         prompt_parts.append(f"User request: {instruction}")
@@ -213,77 +685,156 @@ class ChatbotOrchestrator:
             return []
         
         try:
-            from apps.chat.models import Conversation, Message
+            # Back-to-back turns reuse the formatted history until a message changes
+            cache_key = _history_cache_key(conversation_id)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
             
-            # Get conversation object
-            conversation = Conversation.objects.get(id=conversation_id)
+            # Get last N messages (excluding the current message being processed);
+            # filtering on the foreign key avoids fetching the conversation first
+            rows = list(
+                Message.objects.filter(
+                    conversation_id=conversation_id
+                ).exclude(
+                    role='system'  # Exclude system messages
+                ).order_by('-created_at').values_list('role', 'content')[:_MAX_HISTORY]
+            )
+            rows.reverse()
             
-            # Get last N messages (excluding the current message being processed)
-            max_history = getattr(settings, 'MAX_CONVERSATION_HISTORY', 10)
-            messages = Message.objects.filter(
-                conversation=conversation
-            ).exclude(
-                role='system'  # Exclude system messages
-            ).order_by('-created_at')[:max_history]
-            
-            # Format messages in chronological order (oldest first)
-            history_lines = []
-            for message in reversed(messages):
-                role_display = "User" if message.role == "user" else "Assistant"
-                # Truncate very long messages for context
-                content = message.content
-                if len(content) > 500:
-                    content = content[:500] + "..."
-                
-                history_lines.append(f"{role_display}: {content}")
+            # Format messages in chronological order (oldest first), truncating
+            # very long messages for context
+            history_lines = [
+                f"{'User' if role == 'user' else 'Assistant'}: "
+                f"{content[:500] + '...' if len(content) > 500 else content}"
+                for role, content in rows
+            ]
+            history_lines = _fit_history_to_budget(history_lines)
             
+            cache.set(cache_key, history_lines, _HISTORY_CACHE_TTL)
             return history_lines
             
         except Exception as e:
             logger.warning(f"Error fetching conversation history: {str(e)}")
             return []
     
+    def _begin_temp_tracking(self):
+        """Start tracking temp/ changes for one agent run
+        
+        Returns a watcher recording when one is available, otherwise a full
+        snapshot of temp/ to diff against after the run.
+        """
+        if _TEMP_WATCHER_ENABLED and _TEMP_TRACKER.directory == self._temp_dir:
+            recording = _TEMP_TRACKER.begin()
+            if recording is not None:
+                return recording
+        return self._get_temp_files_snapshot(self._temp_dir)
+    
+    def _end_temp_tracking(self, temp_baseline) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Return the (files_before, files_after) snapshots of the tracked run"""
+        if isinstance(temp_baseline, TempRecording):
+            return _TEMP_TRACKER.end(temp_baseline)
+        return temp_baseline, self._get_temp_files_snapshot(self._temp_dir)
+    
+    def _abort_temp_tracking(self, temp_baseline) -> None:
+        """Stop tracking a run whose changes will not be processed"""
+        if isinstance(temp_baseline, TempRecording):
+            _TEMP_TRACKER.discard(temp_baseline)
+    
     def _get_temp_files_snapshot(self, temp_dir: str) -> Dict[str, float]:
         """Get snapshot of temp directory files with modification times"""
         snapshot = {}
-        if os.path.exists(temp_dir):
-            try:
-                # Get all files recursively in temp directory
-                for pattern in ['**/*.xlsx', '**/*.docx', '**/*.png', '**/*.jpg', '**/*.jpeg',
-                               '**/*.gif', '**/*.svg', '**/*.pdf', '**/*.txt', '**/*.csv']:
-                    for file_path in glob.glob(os.path.join(temp_dir, pattern), recursive=True):
+        try:
+            # Single recursive walk; DirEntry caches the file type so
+            # only matching files need a stat call
+            file_entries = []
+            pending = [temp_dir]
+            while pending:
+                try:
+                    entries = os.scandir(pending.pop())
+                except FileNotFoundError:
+                    # temp/ does not exist yet, or a subdirectory was removed mid-walk
+                    continue
+                with entries:
+                    for entry in entries:
+                        # Hidden entries were never matched by the glob patterns
+                        if entry.name.startswith('.'):
+                            continue
                         try:
-                            mtime = os.path.getmtime(file_path)
-                            snapshot[file_path] = mtime
+                            if entry.is_dir():
+                                pending.append(entry.path)
+                            elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in _ARTIFACT_EXTENSIONS:
+                                file_entries.append(entry)
                         except OSError:
                             continue
-            except Exception as e:
-                logger.warning(f"Error getting temp files snapshot: {e}")
+            
+            # stat() releases the GIL, so large trees (e.g. on network
+            # mounts) are stat'ed concurrently; small ones are not worth
+            # the pool start-up cost
+            if len(file_entries) < _SNAPSHOT_PARALLEL_THRESHOLD:
+                mtimes = map(_get_mtime, file_entries)
+            else:
+                with ThreadPoolExecutor(max_workers=_SNAPSHOT_MAX_WORKERS) as executor:
+                    mtimes = list(executor.map(_get_mtime, file_entries))
+            
+            for entry, mtime in zip(file_entries, mtimes):
+                if mtime is not None:
+                    snapshot[entry.path] = mtime
+        except Exception as e:
+            logger.warning(f"Error getting temp files snapshot: {e}")
         return snapshot
     
     def _extract_artifacts_enhanced(self, result: Any, files_before: Dict[str, float], files_after: Dict[str, float]) -> List[Dict[str, str]]:
         """Enhanced artifact extraction that combines multiple detection methods"""
-        artifacts = []
+        # Gate each detection method on a cheap predicate so trivial results
+        # (None, empty strings, no files in temp/) skip the expensive passes
+        jobs = []
         
         # Method 1: Traditional extraction from result content
-        traditional_artifacts = self._extract_artifacts(result)
-        artifacts.extend(traditional_artifacts)
+        if result:
+            jobs.append((self._extract_artifacts, (result,)))
         
-        # Method 2: File system based detection
-        fs_artifacts = self._extract_artifacts_from_filesystem(files_before, files_after)
-        artifacts.extend(fs_artifacts)
+        # Method 2: File system based detection, only when the run created or
+        # modified a file in temp/ (chat-only answers leave it untouched)
+        fs_changed = files_after is not files_before and any(
+            files_before.get(file_path, -1.0) < mtime for file_path, mtime in files_after.items()
+        )
+        if fs_changed:
+            jobs.append((self._extract_artifacts_from_filesystem, (files_before, files_after)))
         
-        # Method 3: Enhanced string parsing for CodeAgent output
-        if isinstance(result, str):
-            code_artifacts = self._extract_artifacts_from_code_output(result)
-            artifacts.extend(code_artifacts)
+        # Method 3: Enhanced string parsing for CodeAgent output; every pattern
+        # needs a file name with an extension
+        if isinstance(result, str) and len(result) >= _MIN_FILE_MENTION_LENGTH and '.' in result:
+            jobs.append((self._extract_artifacts_from_code_output, (result,)))
+        
+        if not jobs:
+            return []
+        
+        # The detection methods are independent, so run them concurrently
+        if len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                futures = [executor.submit(method, *args) for method, args in jobs]
+                detections = [future.result() for future in futures]
+        else:
+            detections = [method(*args) for method, args in jobs]
+        
+        # Keep the original method order so earlier detections take precedence
+        artifacts = [artifact for batch in detections for artifact in batch]
+        if not artifacts:
+            return []
+        
+        # Collapse identical paths first (keeping the first detection) so each
+        # file is validated only once during robust deduplication
+        paths_in_order = dict.fromkeys(a['path'] for a in artifacts if a.get('path'))
+        first_by_path = {a['path']: a for a in reversed(artifacts) if a.get('path')}
         
         # Enhanced deduplication with path normalization
-        unique_artifacts = self._deduplicate_artifacts_robust(artifacts)
+        unique_artifacts = self._deduplicate_artifacts_robust([first_by_path[path] for path in paths_in_order])
         
         logger.info(f"Enhanced artifact extraction found {len(unique_artifacts)} unique artifacts from {len(artifacts)} total detections")
-        for i, artifact in enumerate(unique_artifacts):
-            logger.debug(f"  Unique artifact {i+1}: {artifact.get('name', 'unknown')} ({artifact.get('type', 'unknown')})")
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, artifact in enumerate(unique_artifacts):
+                logger.debug(f"  Unique artifact {i+1}: {artifact.get('name', 'unknown')} ({artifact.get('type', 'unknown')})")
         
         return unique_artifacts
     
@@ -298,9 +849,6 @@ class ChatbotOrchestrator:
         - File existence validation
         - Detection source tracking
         """
-        import os
-        from pathlib import Path
-        
         # Track detection sources for debugging
         detection_sources = {}
         normalized_paths = {}
@@ -315,7 +863,7 @@ class ChatbotOrchestrator:
             try:
                 # Convert to absolute path if relative
                 if not os.path.isabs(path):
-                    path = os.path.abspath(path)
+                    path = os.path.join(self._cwd, path)
                 
                 # Normalize path separators and case
                 normalized_path = os.path.normpath(path).lower()
@@ -328,11 +876,12 @@ class ChatbotOrchestrator:
                 # Check for duplicates
                 if normalized_path in normalized_paths:
                     # Log duplicate detection
-                    existing_source = detection_sources.get(normalized_path, 'unknown')
-                    current_source = artifact.get('type', 'unknown')
-                    logger.debug(f"Duplicate artifact detected: {Path(path).name}")
-                    logger.debug(f"  First detected by: {existing_source}")
-                    logger.debug(f"  Also detected by: {current_source}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        existing_source = detection_sources.get(normalized_path, 'unknown')
+                        current_source = artifact.get('type', 'unknown')
+                        logger.debug(f"Duplicate artifact detected: {os.path.basename(path)}")
+                        logger.debug(f"  First detected by: {existing_source}")
+                        logger.debug(f"  Also detected by: {current_source}")
                     continue
                 
                 # Add to unique artifacts
@@ -355,6 +904,30 @@ class ChatbotOrchestrator:
         
         return unique_artifacts
     
+    def _absolute_path(self, file_path: str) -> str:
+        """os.path.abspath against the working directory saved at init, without a getcwd() call"""
+        return os.path.normpath(os.path.join(self._cwd, file_path))
+    
+    def _cached_stat(self, file_path: str):
+        """
+        stat() a path at most once while an agent result is processed
+        
+        Extraction, deduplication, status validation and registration all
+        check the same files; the cache is reset for every processed result.
+        Returns None if the path cannot be stat'ed.
+        """
+        key = self._absolute_path(file_path)
+        try:
+            return self._stat_cache[key]
+        except KeyError:
+            pass
+        try:
+            file_stat = os.stat(key)
+        except OSError:
+            file_stat = None
+        self._stat_cache[key] = file_stat
+        return file_stat
+    
     def _validate_artifact_file(self, file_path: str) -> bool:
         """
         Validate that an artifact file is valid for registration
@@ -365,330 +938,392 @@ class ChatbotOrchestrator:
         - File is readable
         - File is in expected temp directory (security)
         """
+        return self._stat_valid_artifact(file_path) is not None
+    
+    def _stat_valid_artifact(self, file_path: str):
+        """Return the stat result of a valid artifact file, or None (see _validate_artifact_file)"""
         try:
-            path_obj = Path(file_path)
+            # Check if file exists; a single stat also gives the size
+            file_stat = self._cached_stat(file_path)
+            if file_stat is None:
+                return None
             
-            # Check if file exists
-            if not path_obj.exists():
-                return False
+            # Directories used to fail the read check; reject them explicitly
+            if not stat.S_ISREG(file_stat.st_mode):
+                return None
             
             # Check if file is not empty
-            if path_obj.stat().st_size == 0:
+            if file_stat.st_size == 0:
                 logger.debug(f"Artifact file is empty: {file_path}")
-                return False
+                return None
             
             # Security check: ensure file is in temp directory
-            temp_dir = os.path.abspath('temp')
-            file_abs_path = os.path.abspath(file_path)
-            if not file_abs_path.startswith(temp_dir):
+            if not _is_in_temp_dir(file_path):
                 logger.warning(f"Artifact file outside temp directory: {file_path}")
-                return False
+                return None
             
-            # Check if file is readable
-            try:
-                with open(file_path, 'rb') as f:
-                    f.read(1)  # Try to read one byte
-                return True
-            except (PermissionError, IOError) as e:
-                logger.debug(f"Artifact file not readable: {file_path} - {e}")
-                return False
+            # Check if file is readable (permission check only, the file is not opened)
+            if not os.access(file_path, os.R_OK):
+                logger.debug(f"Artifact file not readable: {file_path}")
+                return None
+            return file_stat
                 
         except Exception as e:
             logger.debug(f"Error validating artifact file {file_path}: {e}")
-            return False
+            return None
     
     def _extract_artifacts_from_filesystem(self, files_before: Dict[str, float], files_after: Dict[str, float]) -> List[Dict[str, str]]:
         """Extract artifacts by comparing filesystem state"""
         artifacts = []
         
-        # Find new files created during agent execution
-        new_files = set(files_after.keys()) - set(files_before.keys())
-        
-        # Find modified files (with newer modification times)
-        modified_files = set()
-        for file_path in files_before.keys():
-            if file_path in files_after and files_after[file_path] > files_before[file_path]:
-                modified_files.add(file_path)
-        
-        # Process new and modified files
-        for file_path in new_files.union(modified_files):
-            if Path(file_path).exists():
+        # Single pass over the post-run snapshot: new files have no previous
+        # mtime, modified files have a newer one. Every path was seen by that
+        # snapshot, so no extra existence check is needed
+        for file_path, mtime in files_after.items():
+            previous_mtime = files_before.get(file_path)
+            if previous_mtime is None or mtime > previous_mtime:
+                file_name = os.path.basename(file_path)
                 artifacts.append({
                     'type': 'file',
                     'path': file_path,
-                    'name': Path(file_path).name
+                    'name': file_name
                 })
-                logger.debug(f"Filesystem detection found: {Path(file_path).name}")
+                logger.debug(f"Filesystem detection found: {file_name}")
         
         return artifacts
     
     def _extract_artifacts_from_code_output(self, result_str: str) -> List[Dict[str, str]]:
         """Extract artifacts from CodeAgent string output with enhanced patterns"""
         artifacts = []
+        candidate_paths = set()
         
-        # Enhanced patterns for CodeAgent output
-        patterns = [
-            # Function call patterns with file paths
-            (r'excel_generator\([^)]*filename=["\']([^"\']+)["\']', 'file', 'Generated Excel File'),
-            (r'simple_word_generator\([^)]*filename=["\']([^"\']+)["\']', 'file', 'Generated Word Document'),
-            (r'generate_chart\([^)]*filename=["\']([^"\']+)["\']', 'chart', 'Generated Chart'),
+        # Cheap substring prefilter: most chat answers mention no file at all
+        haystack = result_str.lower()
+        if not any(needle in haystack for needle in _CODE_OUTPUT_NEEDLES):
+            return artifacts
+        
+        for match in _CODE_OUTPUT_RE.finditer(result_str):
+            file_type, default_name = _CODE_OUTPUT_GROUP_META[match.lastindex]
             
-            # Direct file path mentions
-            (r'saved to[:\s]+([^\s\n]+\.xlsx)', 'file', 'Excel File'),
-            (r'saved to[:\s]+([^\s\n]+\.docx)', 'file', 'Word Document'),
-            (r'saved to[:\s]+([^\s\n]+\.png)', 'chart', 'Chart Image'),
-            (r'created[:\s]+([^\s\n]+\.xlsx)', 'file', 'Excel File'),
-            (r'created[:\s]+([^\s\n]+\.docx)', 'file', 'Word Document'),
-            (r'generated[:\s]+([^\s\n]+\.png)', 'chart', 'Chart Image'),
+            # Clean up the path
+            file_path = match.group(match.lastindex).strip().strip('"\'')
             
-            # Temp directory patterns
-            (r'(temp[/\\][\w\\/.-]+\.xlsx)', 'file', 'Generated Excel File'),
-            (r'(temp[/\\][\w\\/.-]+\.docx)', 'file', 'Generated Word Document'),
-            (r'(temp[/\\][\w\\/.-]+\.png)', 'chart', 'Generated Chart'),
-            (r'(temp[/\\][\w\\/.-]+\.jpg)', 'chart', 'Generated Chart'),
-            (r'(temp[/\\][\w\\/.-]+\.svg)', 'chart', 'Generated Chart'),
-        ]
-        
-        import re
-        for pattern, file_type, default_name in patterns:
-            matches = re.findall(pattern, result_str, re.IGNORECASE)
-            for match in matches:
-                # Clean up the path
-                file_path = match.strip().strip('"\'')
-                
-                # Make path absolute if relative
-                if not os.path.isabs(file_path):
-                    file_path = os.path.join(os.getcwd(), file_path)
-                
-                # Check if file exists
-                if Path(file_path).exists():
-                    artifacts.append({
-                        'type': file_type,
-                        'path': file_path,
-                        'name': Path(file_path).name
-                    })
-                    logger.debug(f"Code output pattern found: {Path(file_path).name}")
+            # Make path absolute if relative
+            if not os.path.isabs(file_path):
+                file_path = os.path.join(self._cwd, file_path)
+            
+            # Stat each candidate at most once; deduplication keeps the first hit anyway
+            if file_path in candidate_paths:
+                continue
+            candidate_paths.add(file_path)
+            
+            # Check if file exists
+            if self._cached_stat(file_path) is not None:
+                file_name = os.path.basename(file_path)
+                artifacts.append({
+                    'type': file_type,
+                    'path': file_path,
+                    'name': file_name
+                })
+                logger.debug(f"Code output pattern found: {file_name}")
         
         return artifacts
     
     def _extract_artifacts(self, result: Any) -> List[Dict[str, str]]:
         """Extract generated artifacts from result with enhanced error handling"""
+        try:
+            return self._extract_artifacts_by_type(result)
+        except Exception as e:
+            logger.error(f"Error in _extract_artifacts: {e}", exc_info=True)
+            return []
+    
+    @singledispatchmethod
+    def _extract_artifacts_by_type(self, result: Any) -> List[Dict[str, str]]:
+        """Dispatch artifact extraction on the result type; unknown types carry no artifacts"""
+        return []
+    
+    @_extract_artifacts_by_type.register
+    def _extract_artifacts_from_dict(self, result: dict) -> List[Dict[str, str]]:
+        """Parse structured tool results for file paths and artifact IDs"""
         artifacts = []
         
-        try:
-            # Parse result for file paths and artifact IDs
-            if isinstance(result, dict):
-                # Handle structured artifacts from parsing tools
-                if 'artifacts' in result and isinstance(result['artifacts'], list):
-                    for artifact_info in result['artifacts']:
-                        try:
-                            if isinstance(artifact_info, dict) and 'path' in artifact_info:
-                                path = artifact_info['path']
-                                if Path(path).exists():
-                                    artifacts.append({
-                                        'type': artifact_info.get('type', 'file'),
-                                        'path': path,
-                                        'name': artifact_info.get('name', Path(path).name)
-                                    })
-                                    logger.info(f"Extracted artifact: {artifact_info.get('name', 'Unknown')} at {path}")
-                                else:
-                                    logger.warning(f"Artifact path does not exist: {path}")
-                        except Exception as e:
-                            logger.warning(f"Error processing artifact info: {e}")
-                            continue
-                
-                # Handle generated_files list from parsing tools
-                if 'generated_files' in result and isinstance(result['generated_files'], list):
-                    for file_path in result['generated_files']:
-                        try:
-                            if isinstance(file_path, str) and Path(file_path).exists():
-                                artifacts.append({
-                                    'type': 'preview_file',
-                                    'path': file_path,
-                                    'name': Path(file_path).name
-                                })
-                                logger.info(f"Extracted generated file: {Path(file_path).name}")
-                        except Exception as e:
-                            logger.warning(f"Error processing generated file: {e}")
-                            continue
-                
-                # Look for common artifact patterns (existing logic with error handling)
-                path_fields = [
-                    ('output_path', 'file', 'Generated File'),
-                    ('chart_path', 'chart', 'Generated Chart'),
-                    ('artifact_path', 'artifact', 'Generated Artifact')
-                ]
-                
-                for field, file_type, default_name in path_fields:
-                    if field in result:
-                        try:
-                            path = result[field]
-                            if path and Path(path).exists():
-                                artifacts.append({
-                                    'type': file_type,
-                                    'path': path,
-                                    'name': result.get('name', default_name)
-                                })
-                        except Exception as e:
-                            logger.warning(f"Error processing {field}: {e}")
-                            continue
-                
-                # Handle save_artifact_tool output
-                if 'path' in result and result.get('status') == 'success':
-                    try:
-                        path = result['path']
-                        if Path(path).exists():
+        # Handle structured artifacts from parsing tools
+        if 'artifacts' in result and isinstance(result['artifacts'], list):
+            for artifact_info in result['artifacts']:
+                try:
+                    if isinstance(artifact_info, dict) and 'path' in artifact_info:
+                        path = artifact_info['path']
+                        if self._cached_stat(path) is not None:
                             artifacts.append({
-                                'type': 'artifact',
+                                'type': artifact_info.get('type', 'file'),
                                 'path': path,
-                                'name': Path(path).name
+                                'name': artifact_info.get('name', os.path.basename(path))
                             })
-                    except Exception as e:
-                        logger.warning(f"Error processing artifact path: {e}")
-                        
-            elif isinstance(result, str):
-                # Enhanced string parsing for various tool outputs
-                patterns = [
-                    # Chart generator
-                    (r'Chart generated successfully: (.+)', 'chart', 'Generated Chart'),
-                    # Excel generator
-                    (r'Excel file created successfully: (.+)', 'file', 'Generated Excel File'),
-                    (r'Excel file saved to: (.+)', 'file', 'Generated Excel File'),
-                    # Word generator
-                    (r'Word document created successfully: (.+)', 'file', 'Generated Word Document'),
-                    (r'Document saved to: (.+)', 'file', 'Generated Document'),
-                    # Save artifact tool
-                    (r'Artifact saved successfully: (.+)', 'artifact', 'Generated Artifact'),
-                    # Parsing tool patterns
-                    (r'Excel parsed successfully\. Generated (\d+) preview file\(s\)\.', 'message', 'Excel Preview'),
-                    (r'Word document parsed successfully\. Generated (\d+) preview file\(s\)\.', 'message', 'Word Preview'),
-                    # Generic file paths (temp/ directory)
-                    (r'(temp[/\\][\w\\/.-]+\.\w+)', 'file', 'Generated File'),
-                    (r'(temp[/\\]previews[/\\][\w\\/.-]+\.\w+)', 'preview_file', 'Preview File'),
-                ]
-                
-                import re
-                for pattern, file_type, default_name in patterns:
-                    try:
-                        matches = re.findall(pattern, result, re.IGNORECASE)
-                        for match in matches:
-                            path = match.strip().strip('"\'')
-                            if path and Path(path).exists():
-                                artifacts.append({
-                                    'type': file_type,
-                                    'path': path,
-                                    'name': Path(path).name if Path(path).name else default_name
-                                })
-                    except Exception as e:
-                        logger.warning(f"Error processing pattern {pattern}: {e}")
-                        continue
-                        
-        except Exception as e:
-            logger.error(f"Error in _extract_artifacts: {e}", exc_info=True)
+                            logger.info(f"Extracted artifact: {artifact_info.get('name', 'Unknown')} at {path}")
+                        else:
+                            logger.warning(f"Artifact path does not exist: {path}")
+                except Exception as e:
+                    logger.warning(f"Error processing artifact info: {e}")
+                    continue
+
+        # Handle generated_files list from parsing tools
+        if 'generated_files' in result and isinstance(result['generated_files'], list):
+            for file_path in result['generated_files']:
+                try:
+                    if isinstance(file_path, str) and self._cached_stat(file_path) is not None:
+                        file_name = os.path.basename(file_path)
+                        artifacts.append({
+                            'type': 'preview_file',
+                            'path': file_path,
+                            'name': file_name
+                        })
+                        logger.info(f"Extracted generated file: {file_name}")
+                except Exception as e:
+                    logger.warning(f"Error processing generated file: {e}")
+                    continue
+
+        # Look for common artifact patterns (existing logic with error handling)
+        path_fields = [
+            ('output_path', 'file', 'Generated File'),
+            ('chart_path', 'chart', 'Generated Chart'),
+            ('artifact_path', 'artifact', 'Generated Artifact')
+        ]
+
+        for field, file_type, default_name in path_fields:
+            if field in result:
+                try:
+                    path = result[field]
+                    if path and self._cached_stat(path) is not None:
+                        artifacts.append({
+                            'type': file_type,
+                            'path': path,
+                            'name': result.get('name', default_name)
+                        })
+                except Exception as e:
+                    logger.warning(f"Error processing {field}: {e}")
+                    continue
+
+        # Handle save_artifact_tool output
+        if 'path' in result and result.get('status') == 'success':
+            try:
+                path = result['path']
+                if self._cached_stat(path) is not None:
+                    artifacts.append({
+                        'type': 'artifact',
+                        'path': path,
+                        'name': os.path.basename(path)
+                    })
+            except Exception as e:
+                logger.warning(f"Error processing artifact path: {e}")
+        
+        return artifacts
+    
+    @_extract_artifacts_by_type.register
+    def _extract_artifacts_from_str(self, result: str) -> List[Dict[str, str]]:
+        """Parse tool success messages and temp/ paths out of a string result"""
+        artifacts = []
+        
+        # Enhanced string parsing for various tool outputs
+        candidate_paths = set()
+        haystack = result.lower()
+        
+        def add_candidate(match, file_type, default_name):
+            path = match.strip().strip('"\'')
+            # Overlapping patterns often capture the same path; stat it only once
+            if not path or path in candidate_paths:
+                return
+            candidate_paths.add(path)
+            if self._cached_stat(path) is not None:
+                artifacts.append({
+                    'type': file_type,
+                    'path': path,
+                    'name': os.path.basename(path) or default_name
+                })
+        
+        # One pass over the result for all tool success messages
+        if any(needle in haystack for needle in _RESULT_MESSAGE_NEEDLES):
+            try:
+                for match in _RESULT_MESSAGE_RE.finditer(result):
+                    file_type, default_name = _RESULT_MESSAGE_GROUP_META[match.lastindex]
+                    add_candidate(match.group(match.lastindex), file_type, default_name)
+            except Exception as e:
+                logger.warning(f"Error processing tool success messages: {e}")
+        
+        for pattern, file_type, default_name, needle in _RESULT_PATH_PATTERNS:
+            # Skip patterns whose literal text cannot be in the result
+            if needle not in haystack:
+                continue
+            try:
+                for match in pattern.findall(result):
+                    add_candidate(match, file_type, default_name)
+            except Exception as e:
+                logger.warning(f"Error processing pattern {pattern.pattern}: {e}")
+                continue
         
         return artifacts
 
     def _create_artifact_records(self, artifacts: List[Dict[str, str]], message, agent_result=None) -> None:
         """Create Artifact database records for generated files with duplicate prevention"""
-        from apps.chat.models import Artifact
-        from django.db import IntegrityError
+        # Nothing was generated: no queries, no summary, no message update
+        if not artifacts:
+            return
         
         successful_artifacts = 0
         failed_artifacts = 0
         duplicate_artifacts = 0
         
+        # Paths already registered for this message, fetched in one query and
+        # lowercased to keep the previous case-insensitive (iexact) comparison
+        existing_paths = {
+            path.lower()
+            for path in Artifact.objects.filter(message=message).values_list('file_path', flat=True)
+        }
+        
+        # Phase 1: drop invalid and duplicate artifacts before any other work,
+        # keeping the stat of each file for its size
+        valid = []
+        pending_paths = set()
         for artifact_data in artifacts:
             try:
-                file_path = Path(artifact_data['path'])
+                file_path = artifact_data['path']
                 
-                # Use enhanced validation from deduplication process
-                if not self._validate_artifact_file(str(file_path)):
+                # Use enhanced validation from deduplication process; its stat
+                # call also provides the file metadata
+                file_stat = self._stat_valid_artifact(file_path)
+                if file_stat is None:
                     logger.warning(f"Artifact registration failed - validation failed: {file_path} (type: {artifact_data.get('detection_source', 'unknown')})")
                     failed_artifacts += 1
                     continue
                 
-                # Get file metadata with error handling
-                try:
-                    file_size = file_path.stat().st_size
-                except OSError as stat_error:
-                    logger.error(f"Artifact registration failed - cannot stat file {file_path}: {stat_error}")
-                    failed_artifacts += 1
-                    continue
-                
-                mime_type = self._get_mime_type(file_path)
-                
-                # Check for existing artifacts with same file path for this message
-                normalized_path = artifact_data.get('normalized_path', str(file_path).lower())
-                existing_artifacts = Artifact.objects.filter(
-                    message=message,
-                    file_path__iexact=str(file_path)
-                ).exists()
-                
-                if existing_artifacts:
+                # Check for existing artifacts with same file path for this message,
+                # including rows already queued in this batch
+                normalized_path = artifact_data.get('normalized_path', file_path.lower())
+                if normalized_path in pending_paths or file_path.lower() in existing_paths:
                     duplicate_artifacts += 1
-                    logger.debug(f"Artifact already exists for message: {file_path.name}")
+                    logger.debug(f"Artifact already exists for message: {os.path.basename(file_path)}")
                     continue
                 
-                # Extract preview HTML for Word and Excel documents
-                preview_html = None
-                if (mime_type == 'application/vnd.openxmlformats-officedocument.wordprocessingml.document' or
-                    file_path.suffix.lower() == '.docx' or
-                    mime_type == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet' or
-                    mime_type == 'application/vnd.ms-excel' or
-                    file_path.suffix.lower() in ['.xlsx', '.xls']):
-                    preview_html = self._extract_preview_html(file_path, agent_result)
-                
-                # Create Artifact record with enhanced error handling
-                try:
-                    artifact = Artifact.objects.create(
-                        message=message,
-                        file_path=str(file_path),
-                        file_name=file_path.name,
-                        file_type=mime_type,
-                        file_size=file_size,
-                        preview_html=preview_html,
-                        expires_at=timezone.now() + timedelta(hours=24)  # 24-hour expiration
-                    )
-                    
-                    successful_artifacts += 1
-                    detection_source = artifact_data.get('detection_source', 'unknown')
-                    logger.info(f"[OK] Artifact registered: {artifact.file_name} ({artifact.file_size} bytes, detected by: {detection_source})")
-                    
-                except IntegrityError as integrity_error:
-                    # Handle rare race condition where duplicate is created between check and insert
-                    duplicate_artifacts += 1
-                    logger.debug(f"Artifact registration prevented duplicate: {file_path.name} - {integrity_error}")
+                pending_paths.add(normalized_path)
+                file_ext = os.path.splitext(file_path)[1].lower()
+                valid.append((file_path, file_ext, mime_for_suffix(file_ext), file_stat.st_size))
                 
             except Exception as e:
                 failed_artifacts += 1
                 logger.error(f"[FAIL] Artifact registration failed for {artifact_data.get('path', 'unknown path')}: {str(e)}", exc_info=True)
         
+        # Phase 2: extract preview HTML for Word and Excel documents. Parsing the
+        # zipped XML mostly runs outside the GIL, so several documents are parsed concurrently
+        preview_paths = [
+            file_path for file_path, file_ext, mime_type, _ in valid
+            if file_ext in _PREVIEW_EXTENSIONS or mime_type in _PREVIEW_MIME_TYPES
+        ]
+        embedded_preview = _find_embedded_preview_html(agent_result) if preview_paths else None
+        if len(preview_paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(_PREVIEW_MAX_WORKERS, len(preview_paths))) as executor:
+                previews = dict(zip(preview_paths, executor.map(
+                    lambda file_path: self._extract_preview_html(file_path, embedded_preview), preview_paths
+                )))
+        else:
+            previews = {file_path: self._extract_preview_html(file_path, embedded_preview) for file_path in preview_paths}
+        
+        # Phase 3: build the unsaved rows; the whole batch shares one 24-hour expiry
+        expires_at = timezone.now() + timedelta(hours=24)
+        new_artifacts = [
+            Artifact(
+                message=message,
+                file_path=file_path,
+                file_name=os.path.basename(file_path),
+                file_type=mime_type,
+                file_size=file_size,
+                preview_html=previews.get(file_path),
+                expires_at=expires_at
+            )
+            for file_path, _, mime_type, file_size in valid
+        ]
+        
+        # Phase 4: create Artifact records in one multi-row INSERT. The message summary
+        # is written in the same transaction so registration commits once
+        summary_saved = False
+        if new_artifacts:
+            try:
+                with transaction.atomic():
+                    Artifact.objects.bulk_create(new_artifacts, batch_size=_ARTIFACT_BULK_BATCH_SIZE)
+                    self._save_artifact_summary(message, len(new_artifacts), failed_artifacts, duplicate_artifacts)
+                    summary_saved = True
+                successful_artifacts = len(new_artifacts)
+                logger.info(f"[OK] Artifacts registered: {', '.join(a.file_name for a in new_artifacts)}")
+            except Exception as bulk_error:
+                # A single bad row fails the whole INSERT; register the rows one
+                # by one so the valid artifacts are still recorded
+                logger.warning(f"Bulk artifact registration failed, retrying one by one: {bulk_error}")
+                for artifact in new_artifacts:
+                    try:
+                        with transaction.atomic():
+                            Artifact.objects.create(
+                                message=message,
+                                file_path=artifact.file_path,
+                                file_name=artifact.file_name,
+                                file_type=artifact.file_type,
+                                file_size=artifact.file_size,
+                                preview_html=artifact.preview_html,
+                                expires_at=artifact.expires_at
+                            )
+                        successful_artifacts += 1
+                        logger.info(f"[OK] Artifact registered: {artifact.file_name}")
+                    except IntegrityError as integrity_error:
+                        # Handle rare race condition where duplicate is created between check and insert
+                        duplicate_artifacts += 1
+                        logger.debug(f"Artifact registration prevented duplicate: {integrity_error}")
+                    except Exception as e:
+                        failed_artifacts += 1
+                        logger.error(f"[FAIL] Artifact registration failed for {artifact.file_path}: {str(e)}", exc_info=True)
+        
         # Enhanced summary logging
         total_attempts = successful_artifacts + failed_artifacts + duplicate_artifacts
         if total_attempts > 0:
             logger.info(f"Artifact registration summary: {successful_artifacts} registered, {duplicate_artifacts} duplicates prevented, {failed_artifacts} failed ({total_attempts} total)")
         
-        # Log detection method effectiveness
-        detection_methods = {}
-        for artifact_data in artifacts:
-            method = artifact_data.get('detection_source', 'unknown')
-            detection_methods[method] = detection_methods.get(method, 0) + 1
-        
-        if detection_methods:
-            logger.debug(f"Detection method breakdown: {detection_methods}")
-        
-        # Update message metadata with artifact counts
-        if hasattr(message, 'artifacts') and isinstance(message.artifacts, list):
-            # Add artifact count metadata to the message
-            artifact_summary = {
-                'total_generated': total_attempts,
-                'successfully_registered': successful_artifacts,
-                'failed_registration': failed_artifacts,
-                'duplicates_prevented': duplicate_artifacts
-            }
-            if not any(item.get('summary') for item in message.artifacts if isinstance(item, dict)):
-                message.artifacts.append({'summary': artifact_summary})
-                message.save()
+        # Log detection method effectiveness; the breakdown is only counted when it is logged
+        if logger.isEnabledFor(logging.DEBUG):
+            detection_methods = Counter(a.get('detection_source', 'unknown') for a in artifacts)
+            if detection_methods:
+                logger.debug(f"Detection method breakdown: {dict(detection_methods.most_common())}")
+        
+        # Nothing was inserted (or the insert was rolled back): record the summary on its own
+        if not summary_saved:
+            self._save_artifact_summary(message, successful_artifacts, failed_artifacts, duplicate_artifacts)
+    
+    def _save_artifact_summary(self, message, successful: int, failed: int, duplicates: int) -> None:
+        """Append the artifact registration counts to the message, once per message"""
+        if not (hasattr(message, 'artifacts') and isinstance(message.artifacts, list)):
+            return
+        if any(item.get('summary') for item in message.artifacts if isinstance(item, dict)):
+            return
+        
+        summary_entry = {'summary': {
+            'total_generated': successful + failed + duplicates,
+            'successfully_registered': successful,
+            'failed_registration': failed,
+            'duplicates_prevented': duplicates
+        }}
+        if connection.vendor == 'postgresql':
+            # Append in a single UPDATE so concurrent writers to the list are not lost
+            Message.objects.filter(pk=message.pk).update(
+                artifacts=Func(
+                    F('artifacts'),
+                    Value([summary_entry], output_field=JSONField()),
+                    function='jsonb_concat'
+                )
+            )
+            message.artifacts.append(summary_entry)
+        else:
+            message.artifacts.append(summary_entry)
+            try:
+                message.save(update_fields=['artifacts'])
+            except Exception:
+                # Keep the in-memory list in step with the rolled-back row
+                message.artifacts.pop()
+                raise
 
     def _validate_tool_execution_status(self, result_str: str, artifacts: list = None) -> bool:
         """
@@ -713,18 +1348,10 @@ class ChatbotOrchestrator:
         
         # Strategy 1: Check for critical parsing errors FIRST
         # These indicate the agent itself failed and override everything else
-        critical_errors = [
-            'error in code parsing',
-            'invalid code snippet',
-            'regex pattern',
-            'was not found in it',
-            'make sure to include code'
-        ]
-        
-        for error_pattern in critical_errors:
-            if error_pattern in result_lower:
-                logger.debug(f"Critical agent parsing error detected: '{error_pattern}' found in result")
-                return False
+        critical_error = _CRITICAL_ERR_RE.search(result_lower)
+        if critical_error:
+            logger.debug(f"Critical agent parsing error detected: '{critical_error.group()}' found in result")
+            return False
         
         # Strategy 2: If we have valid artifacts, tools likely succeeded
         if artifacts:
@@ -759,7 +1386,7 @@ class ChatbotOrchestrator:
         
         for artifact in artifacts:
             file_path = artifact.get('path', '')
-            file_name = Path(file_path).name if file_path else ''
+            file_name = os.path.basename(file_path) if file_path else ''
             
             # Always validate the file regardless of failure status
             if not self._validate_artifact_file(file_path):
@@ -767,13 +1394,12 @@ class ChatbotOrchestrator:
                 continue
             
             # Check if this specific file is mentioned positively in the result
-            if file_name.lower() in result_lower:
+            mention = result_lower.find(file_name.lower())
+            if mention >= 0:
                 # Look for positive context around this file mention
-                context_start = max(0, result_lower.find(file_name.lower()) - 50)
-                context_end = min(len(result_lower), result_lower.find(file_name.lower()) + len(file_name) + 50)
-                context = result_lower[context_start:context_end]
+                context = result_lower[max(0, mention - 50):mention + len(file_name) + 50]
                 
-                if any(indicator in context for indicator in ['successfully', 'created', 'generated', 'saved']):
+                if _POS_INDICATOR_RE.search(context):
                     filtered_artifacts.append(artifact)
                     logger.debug(f"Kept artifact with positive context: {file_name}")
                 else:
@@ -793,29 +1419,28 @@ class ChatbotOrchestrator:
         to prevent them from being detected as artifacts in future runs.
         """
         try:
-            import time
-            
             # Find new files created during execution
-            new_files = set(files_after.keys()) - set(files_before.keys())
+            new_files = files_after.keys() - files_before.keys()
             
             cleaned_count = 0
+            now = time.time()
             for file_path in new_files:
                 try:
-                    path_obj = Path(file_path)
-                    if path_obj.exists():
+                    file_stat = self._cached_stat(file_path)
+                    if file_stat is not None:
                         # Additional safety check - only clean files in temp directory
-                        temp_dir = os.path.abspath('temp')
-                        file_abs_path = os.path.abspath(file_path)
+                        file_name = os.path.basename(file_path)
                         
-                        if file_abs_path.startswith(temp_dir):
+                        if _is_in_temp_dir(file_path):
                             # Check if file is very recent (created within last few minutes)
-                            file_age = time.time() - path_obj.stat().st_mtime
+                            file_age = now - file_stat.st_mtime
                             if file_age < 300:  # Less than 5 minutes old
-                                path_obj.unlink()
+                                os.remove(file_path)
+                                self._stat_cache.pop(self._absolute_path(file_path), None)
                                 cleaned_count += 1
-                                logger.debug(f"Cleaned up orphaned file: {path_obj.name}")
+                                logger.debug(f"Cleaned up orphaned file: {file_name}")
                             else:
-                                logger.debug(f"Skipped cleanup of older file: {path_obj.name}")
+                                logger.debug(f"Skipped cleanup of older file: {file_name}")
                         else:
                             logger.warning(f"Skipped cleanup of file outside temp directory: {file_path}")
                 except Exception as cleanup_error:
@@ -828,93 +1453,61 @@ class ChatbotOrchestrator:
         except Exception as e:
             logger.warning(f"Error during orphaned artifact cleanup: {e}")
 
-    def _get_mime_type(self, file_path: Path) -> str:
+    def _get_mime_type(self, file_path: str) -> str:
         """Determine MIME type for file"""
-        # Try to guess from file extension first
-        mime_type, _ = mimetypes.guess_type(str(file_path))
-        if mime_type:
-            return mime_type
-        
-        # Fallback to extension-based mapping
-        ext = file_path.suffix.lower()
-        type_mapping = {
-            '.pdf': 'application/pdf',
-            '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            '.xls': 'application/vnd.ms-excel',
-            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            '.doc': 'application/msword',
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.gif': 'image/gif',
-            '.svg': 'image/svg+xml',
-            '.csv': 'text/csv',
-            '.txt': 'text/plain',
-            '.json': 'application/json',
-            '.xml': 'application/xml',
-            '.html': 'text/html',
-            '.zip': 'application/zip',
-            '.md': 'text/markdown'
-        }
-        
-        return type_mapping.get(ext, 'application/octet-stream')
+        return mime_for_suffix(os.path.splitext(file_path)[1].lower())
     
-    def _extract_preview_html(self, file_path: Path, agent_result=None) -> str:
-        """Extract preview HTML for Word and Excel documents from tool results or generate it"""
+    def _extract_preview_html(self, file_path: str, embedded_preview: Optional[str] = None) -> str:
+        """
+        Extract preview HTML for Word and Excel documents from tool results or generate it
+        
+        embedded_preview is the preview_html found in the agent result (see
+        _find_embedded_preview_html); it takes precedence over generating one.
+        """
+        file_name = os.path.basename(file_path)
         try:
-            # First, try to extract from agent result if it contains preview_html
-            if agent_result and isinstance(agent_result, str):
-                import ast
-                import re
-                
-                # Look for dictionary representations in the result string
-                dict_pattern = r'\{[^{}]*preview_html[^{}]*\}'
-                matches = re.findall(dict_pattern, agent_result, re.DOTALL)
-                
-                for match in matches:
-                    try:
-                        # Try to safely evaluate the dictionary string
-                        result_dict = ast.literal_eval(match)
-                        if isinstance(result_dict, dict) and result_dict.get('preview_html'):
-                            return result_dict['preview_html']
-                    except (ValueError, SyntaxError):
-                        continue
+            # First, use the preview HTML the agent result already contains
+            if embedded_preview:
+                return embedded_preview
             
             # Determine file type and generate preview accordingly
-            file_ext = file_path.suffix.lower()
+            file_ext = os.path.splitext(file_name)[1].lower()
             
             if file_ext == '.docx':
                 # Generate Word preview
+                if WordPreviewGenerator is None:
+                    logger.warning("WordPreviewGenerator not available")
+                    return None
                 try:
-                    from apps.agents.tools.word_preview import WordPreviewGenerator
-                    preview_result = WordPreviewGenerator.generate_preview(str(file_path))
+                    preview_result = WordPreviewGenerator.generate_preview(file_path)
                     if preview_result['success']:
-                        logger.info(f"Generated Word preview HTML for {file_path.name}")
+                        logger.info(f"Generated Word preview HTML for {file_name}")
                         return preview_result['preview_html']
                     else:
-                        logger.warning(f"Failed to generate Word preview for {file_path.name}: {preview_result.get('error', 'Unknown error')}")
-                except ImportError:
-                    logger.warning("WordPreviewGenerator not available")
+                        logger.warning(f"Failed to generate Word preview for {file_name}: {preview_result.get('error', 'Unknown error')}")
                 except Exception as e:
-                    logger.error(f"Error generating Word preview for {file_path.name}: {str(e)}")
+                    logger.error(f"Error generating Word preview for {file_name}: {str(e)}")
             
             elif file_ext in ['.xlsx', '.xls']:
                 # Generate Excel preview
+                if ExcelPreviewGenerator is None:
+                    logger.warning("ExcelPreviewGenerator not available")
+                    return None
                 try:
-                    from apps.agents.tools.excel_preview import ExcelPreviewGenerator
-                    preview_result = ExcelPreviewGenerator.generate_preview(str(file_path))
+                    # Collects the preview a tool started in the background, if any
+                    preview_result = ExcelPreviewGenerator.get_preview(file_path)
                     if preview_result['success']:
-                        logger.info(f"Generated Excel preview HTML for {file_path.name}")
+                        logger.info(f"Generated Excel preview HTML for {file_name}")
                         return preview_result['preview_html']
+                    elif preview_result.get('skipped'):
+                        logger.info(f"No Excel preview for {file_name}: {preview_result['error']}")
                     else:
-                        logger.warning(f"Failed to generate Excel preview for {file_path.name}: {preview_result.get('error', 'Unknown error')}")
-                except ImportError:
-                    logger.warning("ExcelPreviewGenerator not available")
+                        logger.warning(f"Failed to generate Excel preview for {file_name}: {preview_result.get('error', 'Unknown error')}")
                 except Exception as e:
-                    logger.error(f"Error generating Excel preview for {file_path.name}: {str(e)}")
+                    logger.error(f"Error generating Excel preview for {file_name}: {str(e)}")
                 
         except Exception as e:
-            logger.error(f"Error extracting preview HTML for {file_path.name}: {str(e)}")
+            logger.error(f"Error extracting preview HTML for {file_name}: {str(e)}")
         
         return None
 
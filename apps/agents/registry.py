@@ -1,4 +1,4 @@
-from typing import Dict, Callable, Any, List
+from typing import Dict, Callable, Any, FrozenSet, List
 import inspect
 from dataclasses import dataclass
 
@@ -9,6 +9,7 @@ class ToolDefinition:
     description: str
     parameters: Dict[str, Any]
     returns: str
+    required: FrozenSet[str] = frozenset()
 
 class ToolRegistry:
     """Registry for SmolAgents tools"""
@@ -38,7 +39,8 @@ class ToolRegistry:
                 func=func,
                 description=description or func.__doc__ or '',
                 parameters=parameters,
-                returns=sig.return_annotation if sig.return_annotation != inspect.Signature.empty else Any
+                returns=sig.return_annotation if sig.return_annotation != inspect.Signature.empty else Any,
+                required=frozenset(param_name for param_name, param_info in parameters.items() if param_info['required'])
             )
             
             self.tools[name] = tool_def
@@ -55,14 +57,16 @@ class ToolRegistry:
     
     def execute_tool(self, name: str, **kwargs) -> Any:
         """Execute a tool with given parameters"""
-        tool = self.get_tool(name)
+        tool = self.tools.get(name)
         if not tool:
             raise ValueError(f"Tool '{name}' not found")
         
-        # Validate parameters
-        for param_name, param_info in tool.parameters.items():
-            if param_info['required'] and param_name not in kwargs:
-                raise ValueError(f"Required parameter '{param_name}' missing for tool '{name}'")
+        # Validate parameters against the required set computed at registration
+        missing = tool.required - kwargs.keys()
+        if missing:
+            # Report the first missing parameter in signature order
+            param_name = next(param_name for param_name in tool.parameters if param_name in missing)
+            raise ValueError(f"Required parameter '{param_name}' missing for tool '{name}'")
         
         return tool.func(**kwargs)
 
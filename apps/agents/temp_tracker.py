@@ -0,0 +1,183 @@
+"""
+Temp directory change tracking
+
+Records the files created or modified under temp/ while agent runs are in
+flight, from filesystem events (watchdog), instead of walking the whole
+directory before and after every run. When watchdog is not installed or the
+observer cannot start, begin() returns None and callers fall back to
+directory snapshots.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Hidden marker files written to flush pending events (see TempDirTracker._sync)
+_SYNC_MARKER_PREFIX = '.tracker-sync-'
+
+# Seconds to wait for the observer to catch up before reporting changes
+_SYNC_TIMEOUT = 2.0
+
+
+class TempRecording:
+    """Paths touched under the watched directory since a run began"""
+
+    def __init__(self):
+        # path -> True if the first event seen created the file, False if it
+        # already existed when the run began (modified, deleted or moved away)
+        self.paths = {}
+
+
+class _RecordingHandler(FileSystemEventHandler):
+    """Forward file events to the tracker"""
+
+    def __init__(self, tracker: 'TempDirTracker'):
+        super().__init__()
+        self.tracker = tracker
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.tracker._record(event.src_path, True)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.tracker._record(event.src_path, False)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.tracker._record(event.src_path, False)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.tracker._record(event.src_path, False)
+            self.tracker._record(event.dest_path, True)
+
+
+class TempDirTracker:
+    """Record file changes under a directory for the runs currently in flight"""
+
+    def __init__(self, directory: str, extensions):
+        self.directory = directory
+        self.extensions = frozenset(extensions)
+        self._recordings = set()
+        self._sync_events = {}
+        self._lock = threading.Lock()
+        self._observer = None
+        self._failed = not WATCHDOG_AVAILABLE
+
+    def begin(self) -> Optional[TempRecording]:
+        """Start recording changes, or return None if no watcher is available"""
+        with self._lock:
+            if not self._ensure_started():
+                return None
+            recording = TempRecording()
+            self._recordings.add(recording)
+            return recording
+
+    def end(self, recording: TempRecording) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Stop a recording and describe its changes as a pair of snapshots
+
+        Returns:
+            (files_before, files_after) in the shape of full temp/ snapshots
+            restricted to the touched files: created files are only in
+            files_after, modified ones are in both with an older mtime before.
+        """
+        self._sync()
+        with self._lock:
+            self._recordings.discard(recording)
+            touched = dict(recording.paths)
+
+        files_before = {}
+        files_after = {}
+        for path, created in touched.items():
+            if not self._is_tracked(path):
+                continue
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                # Removed again before the run finished
+                continue
+            files_after[path] = mtime
+            if not created:
+                # Only the fact that it existed matters to the diff, not its old mtime
+                files_before[path] = 0.0
+        return files_before, files_after
+
+    def discard(self, recording: TempRecording) -> None:
+        """Stop a recording whose changes are not needed"""
+        with self._lock:
+            self._recordings.discard(recording)
+
+    def _ensure_started(self) -> bool:
+        """Start the observer on first use; must be called with the lock held"""
+        if self._observer is not None:
+            return True
+        if self._failed:
+            return False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            observer = Observer()
+            observer.schedule(_RecordingHandler(self), self.directory, recursive=True)
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            logger.warning(f"Temp directory watcher unavailable, falling back to snapshots: {e}")
+            self._failed = True
+            return False
+        self._observer = observer
+        logger.info(f"Watching {self.directory} for generated files")
+        return True
+
+    def _sync(self) -> None:
+        """
+        Wait until the observer has delivered the events already queued
+
+        Events reach the handler asynchronously, so the last file written by a
+        run may not be recorded yet when it returns. Events are delivered in
+        order, so once a marker file written now has been seen, everything
+        before it has been too.
+        """
+        marker = os.path.join(self.directory, f'{_SYNC_MARKER_PREFIX}{uuid.uuid4().hex}')
+        seen = threading.Event()
+        with self._lock:
+            self._sync_events[marker] = seen
+        try:
+            with open(marker, 'w'):
+                pass
+            os.remove(marker)
+            if not seen.wait(_SYNC_TIMEOUT):
+                logger.debug("Temp directory watcher did not catch up in time")
+        except OSError as e:
+            logger.debug(f"Could not sync temp directory watcher: {e}")
+        finally:
+            with self._lock:
+                self._sync_events.pop(marker, None)
+
+    def _record(self, path: str, created: bool) -> None:
+        with self._lock:
+            seen = self._sync_events.get(path)
+            if seen is not None:
+                seen.set()
+                return
+            for recording in self._recordings:
+                recording.paths.setdefault(path, created)
+
+    def _is_tracked(self, path: str) -> bool:
+        """Apply the same filters as a temp/ snapshot: no hidden entries, known extensions"""
+        relative = os.path.relpath(path, self.directory)
+        if any(part.startswith('.') for part in relative.split(os.sep)):
+            return False
+        return os.path.splitext(path)[1].lower() in self.extensions
@@ -13,6 +13,7 @@ from .modify_word_tool import ModifyWordTool
 from .generate_chart_tool import GenerateChartTool
 from .save_artifact_tool import SaveArtifactTool
 from .excel_generator_tool import ExcelGeneratorTool
+from .parallel_tools_tool import ParallelToolsTool
 
 # List of all available tools
 __all__ = [
@@ -23,7 +24,8 @@ __all__ = [
     'ModifyWordTool',
     'GenerateChartTool',
     'SaveArtifactTool',
-    'ExcelGeneratorTool'
+    'ExcelGeneratorTool',
+    'ParallelToolsTool'
 ]
 
 # Tool instances for easy access
@@ -38,13 +40,14 @@ AVAILABLE_TOOLS = [
     ExcelGeneratorTool()
 ]
 
+# Name lookups built once; the first tool registered under a name wins
+_TOOLS_BY_NAME = {tool.name: tool for tool in reversed(AVAILABLE_TOOLS)}
+_TOOL_NAMES = tuple(tool.name for tool in AVAILABLE_TOOLS)
+
 def get_tool_by_name(tool_name: str):
     """Get a tool instance by its name"""
-    for tool in AVAILABLE_TOOLS:
-        if tool.name == tool_name:
-            return tool
-    return None
+    return _TOOLS_BY_NAME.get(tool_name)
 
 def list_tool_names():
     """Get list of all available tool names"""
-    return [tool.name for tool in AVAILABLE_TOOLS]
\ No newline at end of file
+    return list(_TOOL_NAMES)
\ No newline at end of file
@@ -5,13 +5,20 @@ This tool allows the agent to create Excel files with data, tables, and charts
 based on user requests and data analysis.
 """
 
-import pandas as pd
 import openpyxl
+import xlsxwriter
+from collections import namedtuple
+from copy import copy
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.chart import BarChart, LineChart, PieChart, Reference
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter, range_to_tuple
+from openpyxl.workbook.child import avoid_duplicate_name
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
 import tempfile
 import os
-import json
+import re
 import logging
 from typing import Dict, List, Any, Optional
 from smolagents import Tool
@@ -19,12 +26,80 @@ from smolagents import Tool
 # Import our robust utility functions
 from .tool_utils import (
     ToolInputSanitizer, ToolValidator, FileVerifier,
-    DebugLogger, ErrorFormatter
+    DebugLogger, ErrorFormatter, _json_dumps, _json_loads
 )
+from .fast_xlsx import write_simple_xlsx
 from .excel_preview import ExcelPreviewGenerator
 
 logger = logging.getLogger(__name__)
 
+# Shared cell styles: one object per style instead of one per cell
+_TITLE_FONT = Font(size=16, bold=True)
+_TABLE_TITLE_FONT = Font(size=12, bold=True)
+_HEADER_FONT = Font(color="FFFFFF", bold=True)
+_BOLD_FONT = Font(bold=True)
+_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_CENTER = Alignment(horizontal='center')
+_RIGHT = Alignment(horizontal='right')
+_THIN_SIDE = Side(style='thin')
+_THIN_BORDER = Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE)
+
+# Named cell styles, as openpyxl style attributes and as xlsxwriter format properties
+_CELL_STYLES = {
+    'title': {'font': _TITLE_FONT, 'alignment': _CENTER},
+    'table_title': {'font': _TABLE_TITLE_FONT},
+    'header': {'font': _HEADER_FONT, 'fill': _HEADER_FILL, 'alignment': _CENTER, 'border': _THIN_BORDER},
+    'plain_header': {'font': _HEADER_FONT, 'fill': _HEADER_FILL},
+    'text': {'border': _THIN_BORDER},
+    'number': {'border': _THIN_BORDER, 'alignment': _RIGHT},
+    'column_header': {'font': _BOLD_FONT, 'alignment': _CENTER, 'border': _THIN_BORDER},  # pandas' header look
+}
+_XLSXWRITER_FORMATS = {
+    'title': {'bold': True, 'font_size': 16, 'align': 'center'},
+    'table_title': {'bold': True, 'font_size': 12},
+    'header': {'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#366092', 'align': 'center', 'border': 1},
+    'plain_header': {'bold': True, 'font_color': '#FFFFFF', 'bg_color': '#366092'},
+    'text': {'border': 1},
+    'number': {'border': 1, 'align': 'right'},
+    'column_header': {'bold': True, 'align': 'center', 'border': 1},
+}
+
+# xlsxwriter calls vertical bars "column" charts; openpyxl's BarChart draws those
+_XLSXWRITER_CHART_TYPES = {'bar': 'column', 'line': 'line', 'pie': 'pie'}
+
+# Above this many table cells the workbook is written with xlsxwriter, whose
+# constant_memory mode streams rows with less per-cell overhead than openpyxl
+_XLSXWRITER_CELL_THRESHOLD = 50000
+
+# Above this many table cells no HTML preview is generated; the preview
+# re-reads the whole file and only shows its first rows
+_PREVIEW_CELL_THRESHOLD = 50000
+
+# Strings stored as numbers: optional sign, digits with an optional decimal
+# part, surrounding spaces allowed (what int()/float() were tried on before,
+# minus nan/inf and digit-group underscores)
+_NUMERIC_STRING_RE = re.compile(r'\s*[-+]?(?:\d+(?:\.\d*)?|\.\d+)\s*')
+
+# Style of a data cell by the exact type of its value; other types (numpy
+# scalars, ...) fall back to an isinstance check
+_VALUE_STYLES = {int: 'number', float: 'number', bool: 'number', str: 'text'}
+
+# A cell value with one of the named styles above
+_StyledValue = namedtuple('_StyledValue', ['value', 'style'])
+
+# temp/ directory generated workbooks are saved to, resolved once per process
+_TEMP_DIR = None
+
+
+def _get_temp_dir() -> str:
+    """Return the temp/ directory under the working directory, creating it on first use"""
+    global _TEMP_DIR
+    if _TEMP_DIR is None:
+        temp_dir = os.path.join(os.getcwd(), 'temp')
+        os.makedirs(temp_dir, exist_ok=True)
+        _TEMP_DIR = temp_dir
+    return _TEMP_DIR
+
 
 class ExcelGeneratorTool(Tool):
     """
@@ -58,6 +133,11 @@ class ExcelGeneratorTool(Tool):
     )
     
     The data_structure should be a JSON string. Both single and double quotes are supported.
+    Large tables are written with a faster streaming engine automatically; an optional
+    "engine" key ("openpyxl" or "xlsxwriter") forces one. Set "preview": false to skip
+    the HTML preview; it is also skipped for very large tables.
+    Text cells are kept as text; set "coerce_numeric": true on a table to turn numeric
+    strings such as "123" into numbers.
     """
     
     inputs = {
@@ -86,7 +166,7 @@ class ExcelGeneratorTool(Tool):
         """
         # Initialize debug logging
         DebugLogger.log_tool_start('excel_generator', {
-            'data_structure_length': len(str(data_structure)),
+            'data_structure_length': len(data_structure),
             'filename': filename
         })
         
@@ -97,7 +177,7 @@ class ExcelGeneratorTool(Tool):
                 fallback_value={'sheets': []}
             )
             
-            DebugLogger.log_json_parsing('excel_generator', str(data_structure), structure)
+            DebugLogger.log_json_parsing('excel_generator', data_structure, structure)
             
             # Validate input structure
             is_valid, validation_error = ToolValidator.validate_input(structure, 'excel_generator')
@@ -107,31 +187,19 @@ class ExcelGeneratorTool(Tool):
             
             DebugLogger.log_validation_result('excel_generator', True)
             
-            # Create Excel workbook
-            workbook = openpyxl.Workbook()
-            
-            # Remove default sheet
-            workbook.remove(workbook.active)
-            
-            # Process each sheet in the structure
-            sheets_created = 0
-            for sheet_config in structure.get('sheets', []):
-                try:
-                    self._create_sheet(workbook, sheet_config)
-                    sheets_created += 1
-                    logger.debug(f"Created sheet: {sheet_config.get('name', 'Unnamed')}")
-                except Exception as e:
-                    logger.warning(f"Failed to create sheet {sheet_config.get('name', 'Unnamed')}: {str(e)}")
-                    # Continue with other sheets
-            
-            # If no sheets were created, create a default one
-            if not workbook.worksheets:
-                logger.info("No sheets created from input, creating default sheet")
-                self._create_default_sheet(workbook)
-                sheets_created = 1
-            
-            # Save the workbook
-            output_path = self._save_workbook(workbook, filename)
+            # Large tables go through xlsxwriter unless an engine is requested
+            cell_count = self._estimate_cell_count(structure)
+            engine = structure.get('engine') or (
+                'xlsxwriter' if cell_count > _XLSXWRITER_CELL_THRESHOLD else 'openpyxl'
+            )
+            output_path = self._output_path(filename)
+            save = self._save_with_xlsxwriter if engine == 'xlsxwriter' else self._save_with_openpyxl
+            try:
+                sheets_created = save(structure, output_path)
+            except (FileNotFoundError, xlsxwriter.exceptions.FileCreateError):
+                # temp/ was removed after it was created: recreate it and save again
+                os.makedirs(_get_temp_dir(), exist_ok=True)
+                sheets_created = save(structure, output_path)
             
             # Verify file creation
             verification = FileVerifier.verify_excel_file(output_path)
@@ -150,23 +218,23 @@ class ExcelGeneratorTool(Tool):
                 logger.warning("Excel file created but appears to have no data")
                 return f"Excel file created but may be empty: {output_path}"
             
-            # Generate HTML preview
-            preview_result = ExcelPreviewGenerator.generate_preview(output_path)
-            preview_html = None
-            if preview_result['success']:
-                preview_html = preview_result['preview_html']
-                logger.info(f"Generated HTML preview for {filename}")
+            # Generate the HTML preview in the background: it re-reads the whole
+            # file, and is only needed once the file is registered as an artifact
+            if not structure.get('preview', True):
+                ExcelPreviewGenerator.skip_preview(output_path, "Preview disabled by the request")
+            elif cell_count > _PREVIEW_CELL_THRESHOLD:
+                ExcelPreviewGenerator.skip_preview(output_path, f"Preview skipped for {cell_count} table cells")
             else:
-                logger.warning(f"Failed to generate preview for {filename}: {preview_result.get('error', 'Unknown error')}")
+                ExcelPreviewGenerator.submit_preview(output_path)
             
-            # Return structured result including preview
+            # Return structured result; the preview is collected with
+            # ExcelPreviewGenerator.get_preview(file_path)
             result = {
                 'file_path': output_path,
-                'preview_html': preview_html,
                 'message': f"Excel file created successfully: {output_path}"
             }
             
-            return str(result)  # Convert to string for tool compatibility
+            return _json_dumps(result)  # JSON string for tool compatibility
             
         except Exception as e:
             logger.error(f"Error in excel_generator: {str(e)}", exc_info=True)
@@ -174,55 +242,204 @@ class ExcelGeneratorTool(Tool):
                 return ErrorFormatter.format_json_error('excel_generator', str(data_structure), e)
             return f"Error creating Excel file: {str(e)}"
     
+    @staticmethod
+    def _estimate_cell_count(structure: Dict[str, Any]) -> int:
+        """Count the table cells described by the structure, before building anything."""
+        return sum(
+            len(row) if isinstance(row, (list, tuple, dict)) else 1
+            for sheet_config in structure.get('sheets', [])
+            for table_config in sheet_config.get('tables', [])
+            for row in table_config.get('data') or []
+        )
+    
+    def _save_with_openpyxl(self, structure: Dict[str, Any], output_path: str) -> int:
+        """Write the workbook with openpyxl and return the number of sheets created."""
+        # Create a write-only workbook: rows are streamed to XML as they are
+        # appended instead of being kept as Cell objects until save
+        workbook = openpyxl.Workbook(write_only=True)
+        
+        # Process each sheet in the structure
+        sheets_created = 0
+        for sheet_config in structure.get('sheets', []):
+            try:
+                self._create_sheet(workbook, sheet_config)
+                sheets_created += 1
+                logger.debug(f"Created sheet: {sheet_config.get('name', 'Unnamed')}")
+            except Exception as e:
+                logger.warning(f"Failed to create sheet {sheet_config.get('name', 'Unnamed')}: {str(e)}")
+                # Continue with other sheets
+        
+        # If no sheets were created, create a default one
+        if not workbook.worksheets:
+            logger.info("No sheets created from input, creating default sheet")
+            self._create_default_sheet(workbook)
+            sheets_created = 1
+        
+        workbook.save(output_path)
+        return sheets_created
+    
+    def _save_with_xlsxwriter(self, structure: Dict[str, Any], output_path: str) -> int:
+        """
+        Write the workbook with xlsxwriter and return the number of sheets created.
+        
+        constant_memory mode flushes each row once the next one starts, so rows
+        are written strictly in order and the title merge comes first. Strings
+        are written as-is, like openpyxl does, rather than turned into numbers
+        or links.
+        """
+        workbook = xlsxwriter.Workbook(output_path, {
+            'constant_memory': True,
+            'strings_to_numbers': False,
+            'strings_to_urls': False,
+            'nan_inf_to_errors': True,
+        })
+        formats = {name: workbook.add_format(props) for name, props in _XLSXWRITER_FORMATS.items()}
+        
+        sheets_created = 0
+        sheet_names = []
+        for sheet_config in structure.get('sheets', []):
+            # add_worksheet() rejects a name already in use; rename it the way
+            # openpyxl's create_sheet() does (Sales -> Sales1) so both engines
+            # keep the same sheets
+            sheet_name = avoid_duplicate_name(sheet_names, sheet_config.get('name', 'Sheet1'))
+            try:
+                worksheet = workbook.add_worksheet(sheet_name)
+                sheet_names.append(sheet_name)
+                lengths = {}
+                rows = self._sheet_rows(sheet_config, lengths)
+                first_row = 0
+                title = sheet_config.get('title')
+                if title:
+                    worksheet.merge_range(0, 0, 0, 4, title, formats['title'])
+                    first_row = 1
+                self._write_xlsxwriter_rows(worksheet, rows, formats, lengths, first_row)
+                for chart_config in sheet_config.get('charts', []):
+                    self._add_xlsxwriter_chart(workbook, worksheet, chart_config)
+                sheets_created += 1
+                logger.debug(f"Created sheet: {sheet_name}")
+            except Exception as e:
+                logger.warning(f"Failed to create sheet {sheet_name}: {str(e)}")
+                # Continue with other sheets
+        
+        # If no sheets were created, create a default one
+        if not sheet_names:
+            logger.info("No sheets created from input, creating default sheet")
+            worksheet = workbook.add_worksheet("Data")
+            lengths = {}
+            self._write_xlsxwriter_rows(worksheet, self._default_sheet_rows(lengths), formats, lengths)
+            sheets_created = 1
+        
+        workbook.close()
+        return sheets_created
+    
+    def _write_xlsxwriter_rows(self, worksheet, rows: List[List], formats: Dict, lengths: Dict[int, int],
+                               first_row: int = 0) -> None:
+        """Write rows in order to an xlsxwriter worksheet, from first_row on."""
+        for col, width in self._column_widths(lengths).items():
+            worksheet.set_column(col, col, width)
+        for row_idx in range(first_row, len(rows)):
+            for col, value in enumerate(rows[row_idx]):
+                if isinstance(value, _StyledValue):
+                    worksheet.write(row_idx, col, value.value, formats[value.style])
+                else:
+                    worksheet.write(row_idx, col, value)
+    
+    def _add_xlsxwriter_chart(self, workbook, worksheet, chart_config: Dict[str, Any]) -> None:
+        """Add a chart to an xlsxwriter worksheet, one series per column of the data range."""
+        data_range = chart_config.get('data_range')
+        if not data_range:
+            return
+        
+        # Like openpyxl's Reference, the range must name its sheet; the first
+        # row of each column holds the series title
+        sheet_name, (min_col, min_row, max_col, max_row) = range_to_tuple(data_range)
+        if max_row <= min_row:
+            logger.warning(f"Chart data range {data_range} has no values below its title row")
+            return
+        
+        chart = workbook.add_chart({'type': _XLSXWRITER_CHART_TYPES.get(chart_config.get('type', 'bar'), 'column')})
+        for col in range(min_col - 1, max_col):
+            chart.add_series({
+                'name': [sheet_name, min_row - 1, col],
+                'values': [sheet_name, min_row, col, max_row - 1, col],
+            })
+        chart.set_title({'name': chart_config.get('title', 'Chart')})
+        chart.set_style(10)
+        worksheet.insert_chart(chart_config.get('position', 'G2'), chart)
+    
     def _create_sheet(self, workbook: openpyxl.Workbook, sheet_config: Dict[str, Any]) -> None:
         """Create a worksheet based on the configuration."""
         sheet_name = sheet_config.get('name', 'Sheet1')
         sheet = workbook.create_sheet(title=sheet_name)
+        if sheet_config.get('title'):
+            sheet.merged_cells.add('A1:E1')
+        
+        lengths = {}
+        rows = self._sheet_rows(sheet_config, lengths)
+        self._write_rows(sheet, rows, lengths)
+        
+        # Add charts
+        for chart_config in sheet_config.get('charts', []):
+            self._add_chart(sheet, chart_config)
+    
+    def _sheet_rows(self, sheet_config: Dict[str, Any], lengths: Dict[int, int]) -> List[List]:
+        """
+        Lay out the title and tables of a sheet as rows of values.
+        
+        The longest content of each column is recorded in lengths as the rows
+        are built, so column widths need no second pass over the sheet.
+        """
+        rows = []
         
         # Add title if specified
         title = sheet_config.get('title')
         if title:
-            sheet['A1'] = title
-            sheet['A1'].font = Font(size=16, bold=True)
-            sheet['A1'].alignment = Alignment(horizontal='center')
-            sheet.merge_cells('A1:E1')
-            current_row = 3
-        else:
-            current_row = 1
+            rows.append([_StyledValue(title, 'title')])
+            rows.append([])
+            self._track_lengths(lengths, (title,))
         
         # Add data tables
         for table_config in sheet_config.get('tables', []):
-            current_row = self._add_table(sheet, table_config, current_row)
-            current_row += 2  # Add spacing between tables
+            rows.extend(self._add_table(table_config, lengths))
+            rows.extend([[], []])  # Add spacing between tables
         
-        # Add charts
-        for chart_config in sheet_config.get('charts', []):
-            self._add_chart(sheet, chart_config)
-        
-        # Auto-adjust column widths
-        self._auto_adjust_columns(sheet)
+        return rows
     
-    def _add_table(self, sheet: openpyxl.worksheet.worksheet.Worksheet,
-                   table_config: Dict[str, Any], start_row: int) -> int:
-        """Add a data table to the worksheet with robust data handling."""
+    def _write_rows(self, sheet: WriteOnlyWorksheet, rows: List[List], lengths: Dict[int, int]) -> None:
+        """Append rows to a write-only sheet, turning styled values into cells."""
+        # Column widths are written before the first row in write-only mode
+        for col, width in self._column_widths(lengths).items():
+            sheet.column_dimensions[get_column_letter(col + 1)].width = width
+        
+        styles = {}
+        for row in rows:
+            sheet.append([
+                self._styled_cell(sheet, styles, value.value, value.style)
+                if isinstance(value, _StyledValue) else value
+                for value in row
+            ])
+    
+    def _add_table(self, table_config: Dict[str, Any], lengths: Dict[int, int]) -> List[List]:
+        """Build the rows of a data table with robust data handling."""
         data = table_config.get('data', [])
         headers = table_config.get('headers', [])
         table_title = table_config.get('title')
+        coerce_numeric = table_config.get('coerce_numeric', False)
         
-        current_row = start_row
+        rows = []
         
         # Add table title
         if table_title:
-            sheet.cell(row=current_row, column=1, value=table_title)
-            sheet.cell(row=current_row, column=1).font = Font(size=12, bold=True)
-            current_row += 2
+            rows.append([_StyledValue(table_title, 'table_title')])
+            rows.append([])
+            self._track_lengths(lengths, (table_title,))
         
         # Handle various data formats
         processed_data = self._normalize_table_data(data, headers)
         
         if not processed_data:
             logger.warning("No valid data found for table")
-            return current_row
+            return rows
         
         # Extract headers and data rows
         if headers:
@@ -233,7 +450,7 @@ class ExcelGeneratorTool(Tool):
             if isinstance(processed_data[0], (list, tuple)) and len(processed_data) > 1:
                 # Check if first row looks like headers (contains strings)
                 first_row = processed_data[0]
-                if any(isinstance(cell, str) and not cell.isdigit() for cell in first_row):
+                if self._is_header_row(first_row):
                     table_headers = first_row
                     data_rows = processed_data[1:]
                 else:
@@ -248,74 +465,78 @@ class ExcelGeneratorTool(Tool):
         
         # Add headers
         if table_headers:
-            for col, header in enumerate(table_headers, 1):
-                cell = sheet.cell(row=current_row, column=col, value=str(header))
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                cell.font = Font(color="FFFFFF", bold=True)
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-            current_row += 1
+            header_values = [str(header) for header in table_headers]
+            rows.append([_StyledValue(header, 'header') for header in header_values])
+            self._track_lengths(lengths, header_values)
         
         # Add data rows
         for row_data in data_rows:
-            if not isinstance(row_data, (list, tuple)):
+            # Exact type checks first: rows are almost always plain lists
+            row_type = type(row_data)
+            if row_type is not list and row_type is not tuple and not isinstance(row_data, (list, tuple)):
                 # Handle single values or dictionaries
                 if isinstance(row_data, dict):
                     row_data = list(row_data.values())
                 else:
                     row_data = [row_data]
             
-            for col, value in enumerate(row_data, 1):
-                try:
-                    # Safely convert value to appropriate type
-                    cell_value = self._safe_cell_value(value)
-                    cell = sheet.cell(row=current_row, column=col, value=cell_value)
-                    cell.border = Border(
-                        left=Side(style='thin'),
-                        right=Side(style='thin'),
-                        top=Side(style='thin'),
-                        bottom=Side(style='thin')
-                    )
-                    # Format numbers
-                    if isinstance(cell_value, (int, float)):
-                        cell.alignment = Alignment(horizontal='right')
-                except Exception as e:
-                    logger.warning(f"Error setting cell value at row {current_row}, col {col}: {e}")
-                    sheet.cell(row=current_row, column=col, value=str(value) if value is not None else "")
-            
-            current_row += 1
+            # Values are normalized up front, so building the cells cannot fail;
+            # numbers are right-aligned
+            cell_values = [self._safe_cell_value(value, coerce_numeric) for value in row_data]
+            self._track_lengths(lengths, cell_values)
+            rows.append([
+                _StyledValue(cell_value, _VALUE_STYLES.get(type(cell_value)) or self._value_style(cell_value))
+                for cell_value in cell_values
+            ])
         
         logger.debug(f"Added table with {len(data_rows)} data rows")
-        return current_row
+        return rows
+    
+    @staticmethod
+    def _styled_cell(sheet: WriteOnlyWorksheet, styles: Dict, value: Any, style: str) -> Cell:
+        """
+        Create a write-only cell carrying one of the named cell styles.
+        
+        Assigning a style looks it up in the workbook's style tables, which costs
+        more than writing the cell itself. The resolved style of each name is
+        kept in styles (one dict per sheet) and copied onto the following cells.
+        """
+        cell = WriteOnlyCell(sheet, value=value)
+        resolved = styles.get(style)
+        if resolved is not None:
+            cell._style = copy(resolved)
+            return cell
+        
+        for attribute, style_object in _CELL_STYLES[style].items():
+            setattr(cell, attribute, style_object)
+        styles[style] = copy(cell._style)
+        return cell
     
     def _normalize_table_data(self, data: Any, headers: List = None) -> List[List]:
         """Normalize various data formats into a consistent list of lists."""
-        if not data:
-            return []
-        
-        # Handle pandas DataFrame
+        # Handle pandas DataFrame (checked first: a DataFrame has no truth value)
         if hasattr(data, 'values') and hasattr(data, 'columns'):
-            # It's a DataFrame
-            result = data.values.tolist()
-            if not headers and hasattr(data, 'columns'):
-                # Prepend column names as first row
-                result.insert(0, list(data.columns))
+            if data.empty:
+                return []
+            # Column names first, then one tuple per row read column-wise,
+            # without building the object array of .values
+            result = [] if headers else [list(data.columns)]
+            result.extend(data.itertuples(index=False, name=None))
             return result
         
+        if not data:
+            return []
+        
         # Handle list of dictionaries
         if isinstance(data, list) and data and isinstance(data[0], dict):
             keys = list(data[0].keys())
-            result = []
-            if not headers:
-                result.append(keys)  # Add keys as headers
-            for item in data:
-                result.append([item.get(key, '') for key in keys])
+            result = [] if headers else [keys]  # Add keys as headers
+            first_keys = data[0].keys()
+            if all(isinstance(item, dict) and item.keys() == first_keys for item in data):
+                # Every row has exactly these keys: index directly
+                result.extend([item[key] for key in keys] for item in data)
+            else:
+                result.extend([item.get(key, '') for key in keys] for item in data)
             return result
         
         # Handle nested lists
@@ -333,35 +554,37 @@ class ExcelGeneratorTool(Tool):
         # Handle single values
         return [[data]]
     
-    def _safe_cell_value(self, value: Any) -> Any:
-        """Safely convert a value for Excel cell insertion."""
+    def _safe_cell_value(self, value: Any, coerce_numeric: bool = False) -> Any:
+        """
+        Safely convert a value for Excel cell insertion.
+        
+        Strings are kept as text unless coerce_numeric is set, in which case
+        numeric strings such as "123" become numbers.
+        """
         if value is None:
             return ""
         
-        # Handle numeric strings
-        if isinstance(value, str):
-            # Try to convert to number if it looks numeric
-            try:
-                if '.' in value:
-                    return float(value)
-                else:
-                    return int(value)
-            except ValueError:
-                return value
-        
-        # Handle boolean values
-        if isinstance(value, bool):
+        # JSON numbers and booleans are already the right type; exact type
+        # checks are cheaper than isinstance for the most common cells
+        value_type = type(value)
+        if value_type is int or value_type is float or value_type is bool:
             return value
         
-        # Handle numeric values
+        # Handle numeric strings, matched up front instead of trying int()/float()
+        if value_type is str:
+            if coerce_numeric and _NUMERIC_STRING_RE.fullmatch(value):
+                return float(value) if '.' in value else int(value)
+            # Control characters are rejected by openpyxl
+            return ILLEGAL_CHARACTERS_RE.sub('', value)
+        
+        # Handle numeric subclasses (numpy scalars, ...)
         if isinstance(value, (int, float)):
             return value
         
         # Convert everything else to string
-        return str(value)
+        return ILLEGAL_CHARACTERS_RE.sub('', str(value))
     
-    def _add_chart(self, sheet: openpyxl.worksheet.worksheet.Worksheet, 
-                   chart_config: Dict[str, Any]) -> None:
+    def _add_chart(self, sheet: WriteOnlyWorksheet, chart_config: Dict[str, Any]) -> None:
         """Add a chart to the worksheet."""
         chart_type = chart_config.get('type', 'bar')
         data_range = chart_config.get('data_range')
@@ -385,69 +608,69 @@ class ExcelGeneratorTool(Tool):
         chart.title = title
         chart.style = 10
         
-        # Add data to chart
-        data = Reference(sheet, range_string=data_range)
+        # Add data to chart. The range is parsed once into coordinates; it
+        # usually names the sheet being built, which saves a workbook lookup
+        sheet_name, (min_col, min_row, max_col, max_row) = range_to_tuple(data_range)
+        source = sheet if sheet_name == sheet.title else sheet.parent[sheet_name]
+        data = Reference(source, min_col=min_col, min_row=min_row, max_col=max_col, max_row=max_row)
         chart.add_data(data, titles_from_data=True)
         
         # Add chart to sheet
         sheet.add_chart(chart, position)
     
-    def _auto_adjust_columns(self, sheet: openpyxl.worksheet.worksheet.Worksheet) -> None:
-        """Auto-adjust column widths based on content."""
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-            sheet.column_dimensions[column_letter].width = adjusted_width
+    @staticmethod
+    def _value_style(value: Any) -> str:
+        """Style of a data cell whose value type is not in _VALUE_STYLES."""
+        return 'number' if isinstance(value, (int, float)) else 'text'
     
-    def _create_default_sheet(self, workbook: openpyxl.Workbook) -> None:
-        """Create a default sheet with sample data."""
-        sheet = workbook.create_sheet(title="Data")
-        
-        # Add sample headers
+    @staticmethod
+    def _is_header_row(row) -> bool:
+        """Whether a row looks like headers, i.e. holds a non-numeric string."""
+        # Table data comes from JSON, so strings are exactly str
+        for cell in row:
+            if type(cell) is str and not cell.isdigit():
+                return True
+        return False
+    
+    @staticmethod
+    def _track_lengths(lengths: Dict[int, int], values) -> None:
+        """Raise the recorded content length of each column to fit a row of values."""
+        for col, value in enumerate(values):
+            length = len(str(value))
+            if length > lengths.get(col, 0):
+                lengths[col] = length
+    
+    @staticmethod
+    def _column_widths(lengths: Dict[int, int]) -> Dict[int, int]:
+        """Column widths (0-based column -> width) for the recorded content lengths."""
+        return {col: min(max_length + 2, 50) for col, max_length in lengths.items()}  # Cap at 50 characters
+    
+    def _default_sheet_rows(self, lengths: Dict[int, int]) -> List[List]:
+        """Sample headers and data for the sheet created when the input had none."""
         headers = ["Item", "Value", "Category"]
-        for col, header in enumerate(headers, 1):
-            cell = sheet.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.font = Font(color="FFFFFF", bold=True)
-        
-        # Add sample data
         sample_data = [
             ["Sample Item 1", 100, "Category A"],
             ["Sample Item 2", 200, "Category B"],
             ["Sample Item 3", 150, "Category A"]
         ]
-        
-        for row_idx, row_data in enumerate(sample_data, 2):
-            for col_idx, value in enumerate(row_data, 1):
-                sheet.cell(row=row_idx, column=col_idx, value=value)
-        
-        self._auto_adjust_columns(sheet)
+        for row in [headers] + sample_data:
+            self._track_lengths(lengths, row)
+        return [[_StyledValue(header, 'plain_header') for header in headers]] + sample_data
     
-    def _save_workbook(self, workbook: openpyxl.Workbook, filename: str) -> str:
-        """Save the workbook and return the file path."""
+    def _create_default_sheet(self, workbook: openpyxl.Workbook) -> None:
+        """Create a default sheet with sample data."""
+        sheet = workbook.create_sheet(title="Data")
+        lengths = {}
+        rows = self._default_sheet_rows(lengths)
+        self._write_rows(sheet, rows, lengths)
+    
+    def _output_path(self, filename: str) -> str:
+        """Return the temp/ path the workbook is saved to."""
         # Ensure filename has .xlsx extension
         if not filename.endswith('.xlsx'):
             filename += '.xlsx'
         
-        # Create temp directory if it doesn't exist
-        temp_dir = os.path.join(os.getcwd(), 'temp')
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Save file
-        output_path = os.path.join(temp_dir, filename)
-        workbook.save(output_path)
-        
-        return output_path
+        return os.path.join(_get_temp_dir(), filename)
 
 
 class SimpleExcelGeneratorTool(Tool):
@@ -483,24 +706,30 @@ class SimpleExcelGeneratorTool(Tool):
     def forward(self, data: str, headers: str, filename: str) -> str:
         """Generate a simple Excel file from data."""
         try:
-            # Parse inputs
-            data_array = json.loads(data)
-            headers_array = json.loads(headers) if headers else None
-            
-            # Create DataFrame
-            df = pd.DataFrame(data_array, columns=headers_array)
+            # Parse inputs (with orjson when it is installed)
+            data_array = _json_loads(data)
+            headers_array = _json_loads(headers) if headers else None
+            if not headers_array and data_array and isinstance(data_array[0], dict):
+                # Keys of all dict rows in first-seen order, as pd.DataFrame
+                # used them for the header row; rows are matched to them by key
+                headers_array = list(dict.fromkeys(
+                    key for row in data_array if isinstance(row, dict) for key in row
+                ))
             
             # Ensure filename has .xlsx extension
             if not filename.endswith('.xlsx'):
                 filename += '.xlsx'
             
-            # Create temp directory if it doesn't exist
-            temp_dir = os.path.join(os.getcwd(), 'temp')
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            # Save file
-            output_path = os.path.join(temp_dir, filename)
-            df.to_excel(output_path, index=False)
+            # Save file. The data is values only, so the sheet XML is written
+            # directly instead of building openpyxl cells
+            output_path = os.path.join(_get_temp_dir(), filename)
+            sheets = [{'name': 'Sheet1', 'headers': headers_array, 'rows': data_array}]
+            try:
+                write_simple_xlsx(output_path, sheets)
+            except FileNotFoundError:
+                # temp/ was removed after it was created: recreate it and save again
+                os.makedirs(_get_temp_dir(), exist_ok=True)
+                write_simple_xlsx(output_path, sheets)
             
             return f"Simple Excel file created successfully: {output_path}"
             
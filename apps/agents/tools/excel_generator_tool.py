@@ -9,12 +9,39 @@ import pandas as pd
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.chart import BarChart, LineChart, PieChart, Reference
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+from copy import copy
+from itertools import zip_longest
 import tempfile
 import os
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from smolagents import Tool
 
+from .tool_utils import _json_loads
+
+# Shared styles, assigned to cells by reference
+_TITLE_FONT = Font(size=16, bold=True)
+_TABLE_TITLE_FONT = Font(size=12, bold=True)
+_HEADER_FONT = Font(color="FFFFFF", bold=True)
+_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_CENTER = Alignment(horizontal='center')
+_RIGHT = Alignment(horizontal='right')
+_THIN_SIDE = Side(style='thin')
+_THIN_BORDER = Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE)
+
+# Named cell styles: cell attribute -> shared style object
+_CELL_STYLES = {
+    'title': {'font': _TITLE_FONT, 'alignment': _CENTER},
+    'table_title': {'font': _TABLE_TITLE_FONT},
+    'header': {'font': _HEADER_FONT, 'fill': _HEADER_FILL, 'alignment': _CENTER, 'border': _THIN_BORDER},
+    'plain_header': {'font': _HEADER_FONT, 'fill': _HEADER_FILL},
+    'text': {'border': _THIN_BORDER},
+    'number': {'border': _THIN_BORDER, 'alignment': _RIGHT},
+}
+
 
 class ExcelGeneratorTool(Tool):
     """
@@ -101,22 +128,26 @@ class ExcelGeneratorTool(Tool):
             str: Path to the generated Excel file
         """
         try:
-            # Parse the data structure
-            structure = json.loads(data_structure)
+            # Parse the data structure (with orjson when it is installed;
+            # errors are json.JSONDecodeError either way)
+            structure = _json_loads(data_structure)
             
-            # Create Excel workbook
-            workbook = openpyxl.Workbook()
+            # Create a write-only workbook: rows are streamed to XML as they
+            # are appended instead of being kept as cells until save
+            workbook = openpyxl.Workbook(write_only=True)
             
-            # Remove default sheet
-            workbook.remove(workbook.active)
+            # Process each sheet in the structure. Every sheet is laid out
+            # before any row is streamed, so an invalid table or chart fails
+            # before a sheet is half written
+            sheets = [self._create_sheet(workbook, sheet_config) for sheet_config in structure.get('sheets', [])]
             
-            # Process each sheet in the structure
-            for sheet_config in structure.get('sheets', []):
-                self._create_sheet(workbook, sheet_config)
+            # If no sheets were created, create a default one. A write-only
+            # workbook starts without the blank "Sheet" of Workbook()
+            if not sheets:
+                sheets.append(self._create_default_sheet(workbook))
             
-            # If no sheets were created, create a default one
-            if not workbook.worksheets:
-                self._create_default_sheet(workbook)
+            for sheet, rows, lengths in sheets:
+                self._write_rows(sheet, rows, lengths)
             
             # Save the workbook
             output_path = self._save_workbook(workbook, filename)
@@ -128,84 +159,116 @@ class ExcelGeneratorTool(Tool):
         except Exception as e:
             return f"Error creating Excel file: {str(e)}"
     
-    def _create_sheet(self, workbook: openpyxl.Workbook, sheet_config: Dict[str, Any]) -> None:
-        """Create a worksheet based on the configuration."""
+    def _create_sheet(self, workbook: openpyxl.Workbook,
+                      sheet_config: Dict[str, Any]) -> Tuple[WriteOnlyWorksheet, List[List[Cell]], Dict[int, int]]:
+        """
+        Create a worksheet based on the configuration.
+        
+        Returns the sheet, the rows to write to it and the content length of
+        each column, recorded as the rows are built.
+        """
         sheet_name = sheet_config.get('name', 'Sheet1')
         sheet = workbook.create_sheet(title=sheet_name)
         
+        # Write-only sheets are written once, top to bottom, so all rows are
+        # laid out first and the column widths set before any row
+        rows = []
+        styles = {}
+        lengths = {}
+        
         # Add title if specified
         title = sheet_config.get('title')
         if title:
-            sheet['A1'] = title
-            sheet['A1'].font = Font(size=16, bold=True)
-            sheet['A1'].alignment = Alignment(horizontal='center')
-            sheet.merge_cells('A1:E1')
-            current_row = 3
-        else:
-            current_row = 1
+            rows.append([self._styled_cell(sheet, styles, title, 'title')])
+            rows.append([])
         
         # Add data tables
-        for table_config in sheet_config.get('tables', []):
-            current_row = self._add_table(sheet, table_config, current_row)
-            current_row += 2  # Add spacing between tables
+        for index, table_config in enumerate(sheet_config.get('tables', [])):
+            if index:
+                rows.extend(([], []))  # Add spacing between tables
+            rows.extend(self._add_table(sheet, styles, lengths, table_config))
+        
+        if title:
+            # Merge the title across the columns the tables use (A1:E1 without tables)
+            columns = max(lengths, default=0) or 5
+            if columns > 1:
+                sheet.merged_cells.add(f'A1:{get_column_letter(columns)}1')
+            self._track_lengths(lengths, [(title,)])
         
         # Add charts
         for chart_config in sheet_config.get('charts', []):
             self._add_chart(sheet, chart_config)
         
-        # Auto-adjust column widths
-        self._auto_adjust_columns(sheet)
+        return sheet, rows, lengths
     
-    def _add_table(self, sheet: openpyxl.worksheet.worksheet.Worksheet, 
-                   table_config: Dict[str, Any], start_row: int) -> int:
-        """Add a data table to the worksheet."""
+    def _add_table(self, sheet: WriteOnlyWorksheet, styles: Dict, lengths: Dict[int, int],
+                   table_config: Dict[str, Any]) -> List[List[Cell]]:
+        """Build the rows of a data table."""
         data = table_config.get('data', [])
         headers = table_config.get('headers', [])
         table_title = table_config.get('title')
         
-        current_row = start_row
+        rows = []
         
         # Add table title
         if table_title:
-            sheet.cell(row=current_row, column=1, value=table_title)
-            sheet.cell(row=current_row, column=1).font = Font(size=12, bold=True)
-            current_row += 2
+            rows.append([self._styled_cell(sheet, styles, table_title, 'table_title')])
+            rows.append([])
+            self._track_lengths(lengths, [(table_title,)])
         
         # Add headers
         if headers:
-            for col, header in enumerate(headers, 1):
-                cell = sheet.cell(row=current_row, column=col, value=header)
-                cell.font = Font(bold=True)
-                cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                cell.font = Font(color="FFFFFF", bold=True)
-                cell.alignment = Alignment(horizontal='center')
-                cell.border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-            current_row += 1
+            rows.append([self._styled_cell(sheet, styles, header, 'header') for header in headers])
+            self._track_lengths(lengths, [headers])
         
-        # Add data rows
+        # Add data rows; numbers are right-aligned
         for row_data in data:
-            for col, value in enumerate(row_data, 1):
-                cell = sheet.cell(row=current_row, column=col, value=value)
-                cell.border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-                # Format numbers
-                if isinstance(value, (int, float)):
-                    cell.alignment = Alignment(horizontal='right')
-            current_row += 1
+            rows.append([
+                self._styled_cell(sheet, styles, value, 'number' if isinstance(value, (int, float)) else 'text')
+                for value in row_data
+            ])
+        self._track_lengths(lengths, data)
+        
+        return rows
+    
+    @staticmethod
+    def _styled_cell(sheet: WriteOnlyWorksheet, styles: Dict, value: Any, style: str) -> Cell:
+        """
+        Create a write-only cell carrying one of the named cell styles.
+        
+        Assigning a style looks it up in the workbook's style tables, which costs
+        more than writing the cell itself. The resolved style of each name is
+        kept in styles (one dict per sheet) and copied onto the following cells.
+        """
+        cell = WriteOnlyCell(sheet, value=value)
+        resolved = styles.get(style)
+        if resolved is not None:
+            cell._style = copy(resolved)
+            return cell
         
-        return current_row
+        for attribute, style_object in _CELL_STYLES[style].items():
+            setattr(cell, attribute, style_object)
+        styles[style] = copy(cell._style)
+        return cell
+    
+    @staticmethod
+    def _track_lengths(lengths: Dict[int, int], rows) -> None:
+        """Raise the recorded content length of each column (1-based) to fit a block of rows."""
+        for col, column in enumerate(zip_longest(*rows), 1):
+            length = max((len(str(value)) for value in column if value is not None), default=0)
+            if length > lengths.get(col, 0):
+                lengths[col] = length
     
-    def _add_chart(self, sheet: openpyxl.worksheet.worksheet.Worksheet, 
-                   chart_config: Dict[str, Any]) -> None:
+    def _write_rows(self, sheet: WriteOnlyWorksheet, rows: List[List[Cell]], lengths: Dict[int, int]) -> None:
+        """Size the columns to the recorded content lengths, then stream the rows to the sheet."""
+        # Widths must be set before the first row is written
+        for col, max_length in lengths.items():
+            sheet.column_dimensions[get_column_letter(col)].width = min(max_length + 2, 50)  # Cap at 50 characters
+        
+        for row in rows:
+            sheet.append(row)
+    
+    def _add_chart(self, sheet: WriteOnlyWorksheet, chart_config: Dict[str, Any]) -> None:
         """Add a chart to the worksheet."""
         chart_type = chart_config.get('type', 'bar')
         data_range = chart_config.get('data_range')
@@ -236,33 +299,15 @@ class ExcelGeneratorTool(Tool):
         # Add chart to sheet
         sheet.add_chart(chart, position)
     
-    def _auto_adjust_columns(self, sheet: openpyxl.worksheet.worksheet.Worksheet) -> None:
-        """Auto-adjust column widths based on content."""
-        for column in sheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-            sheet.column_dimensions[column_letter].width = adjusted_width
-    
-    def _create_default_sheet(self, workbook: openpyxl.Workbook) -> None:
-        """Create a default sheet with sample data."""
+    def _create_default_sheet(
+            self, workbook: openpyxl.Workbook) -> Tuple[WriteOnlyWorksheet, List[List[Cell]], Dict[int, int]]:
+        """Create a default sheet with sample data, returned like _create_sheet() does."""
         sheet = workbook.create_sheet(title="Data")
         
         # Add sample headers
         headers = ["Item", "Value", "Category"]
-        for col, header in enumerate(headers, 1):
-            cell = sheet.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.font = Font(color="FFFFFF", bold=True)
+        styles = {}
+        rows = [[self._styled_cell(sheet, styles, header, 'plain_header') for header in headers]]
         
         # Add sample data
         sample_data = [
@@ -270,12 +315,11 @@ class ExcelGeneratorTool(Tool):
             ["Sample Item 2", 200, "Category B"],
             ["Sample Item 3", 150, "Category A"]
         ]
+        rows.extend([WriteOnlyCell(sheet, value=value) for value in row_data] for row_data in sample_data)
         
-        for row_idx, row_data in enumerate(sample_data, 2):
-            for col_idx, value in enumerate(row_data, 1):
-                sheet.cell(row=row_idx, column=col_idx, value=value)
-        
-        self._auto_adjust_columns(sheet)
+        lengths = {}
+        self._track_lengths(lengths, [headers] + sample_data)
+        return sheet, rows, lengths
     
     def _save_workbook(self, workbook: openpyxl.Workbook, filename: str) -> str:
         """Save the workbook and return the file path."""
@@ -1,12 +1,155 @@
 import pandas as pd
+import numpy as np
+import openpyxl
 from xlsxwriter import Workbook
 from xlsxwriter.chart import Chart
+from xlsxwriter.utility import xl_cell_to_rowcol
+import datetime
+import heapq
 import logging
+import math
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Number formats pandas' to_excel gives dates, datetimes and timedeltas
+_NUM_FORMATS = {
+    'datetime': 'YYYY-MM-DD HH:MM:SS',
+    'date': 'YYYY-MM-DD',
+    'timedelta': '0',
+}
+
+# Chart types accepted in add_chart operations, mapped to xlsxwriter types
+_CHART_TYPE_MAP = {
+    'column': 'column',
+    'bar': 'bar',
+    'line': 'line',
+    'pie': 'pie',
+    'scatter': 'scatter',
+    'area': 'area',
+}
+
+
+def _excel_value(value):
+    """
+    Convert a DataFrame value the way pandas' xlsxwriter writer does
+
+    Returns (value, number format name); the value is None for blank cells
+    (NaN, NaT, None, empty string), which are not written.
+    """
+    value_type = type(value)
+    if value_type is str:
+        return (value or None), None
+    if value_type is int or value_type is bool:
+        return value, None
+    if isinstance(value, (float, np.floating)):
+        if value != value:
+            return None, None
+        if math.isinf(value):
+            return ('inf' if value > 0 else '-inf'), None
+        return float(value), None
+    if value is None or value is pd.NaT or value is pd.NA:
+        return None, None
+    if isinstance(value, (int, np.integer)):
+        return int(value), None
+    if isinstance(value, np.bool_):
+        return bool(value), None
+    if isinstance(value, Decimal):
+        return value, None
+    if isinstance(value, datetime.datetime):
+        return value, 'datetime'
+    if isinstance(value, datetime.date):
+        return value, 'date'
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds() / 86400, 'timedelta'
+    return str(value), None
+
+
+class _SheetLayout:
+    """
+    Content of one output worksheet, collected before any cell is written
+
+    The workbook is written in constant_memory mode, which flushes a row to
+    disk as soon as a later row is started, so operations cannot write to
+    the worksheet as they go. They add layers here (DataFrames, rows copied
+    from the input file, formulas) and write() streams the sheet once, top to bottom. A later layer
+    overwrites the cells of an earlier one, as repeated to_excel() and
+    write_formula() calls on the same sheet did.
+    """
+
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+        self.layers = []
+        self.charts = []
+
+    def add_frame(self, df: pd.DataFrame) -> None:
+        """Lay out a DataFrame as to_excel(index=False) does: header row, then data"""
+        self.layers.append(self._frame_rows(df))
+
+    def add_rows(self, rows, start_row: int = 0) -> None:
+        """Lay out rows of values as they are, the first one at start_row"""
+        self.layers.append((row, 0, values, False) for row, values in enumerate(rows, start_row))
+
+    def add_formula(self, cell: str, formula: str) -> None:
+        row, col = xl_cell_to_rowcol(cell)
+        self.layers.append(iter([(row, col, (formula,), True)]))
+
+    @staticmethod
+    def _frame_rows(df: pd.DataFrame):
+        """Yield (row, first column, values, is_formula) for each row of a DataFrame"""
+        yield 0, 0, tuple(df.columns), False
+        for row, values in enumerate(df.itertuples(index=False, name=None), 1):
+            yield row, 0, values, False
+
+    def write(self, workbook: Workbook, formats: Dict[str, Any]) -> None:
+        """Write the layers row by row, then insert the charts"""
+        worksheet = self.worksheet
+        if len(self.layers) == 1:
+            # Nothing to merge, e.g. a sheet copied from the input file
+            rows = ((item[0], (item,)) for item in self.layers[0])
+        else:
+            rows = groupby(heapq.merge(*self.layers, key=itemgetter(0)), key=itemgetter(0))
+
+        for row, group in rows:
+            group = tuple(group)
+            if len(group) == 1 and not group[0][3]:
+                _, start, values, _ = group[0]
+                for col, value in enumerate(values, start):
+                    self._write_value(workbook, formats, row, col, value)
+                continue
+
+            merged = {}
+            for _, start, values, is_formula in group:
+                for col, value in enumerate(values, start):
+                    # Blank cells are not written, so they leave earlier values in place
+                    if is_formula or _excel_value(value)[0] is not None:
+                        merged[col] = value, is_formula
+            for col in sorted(merged):
+                value, is_formula = merged[col]
+                if is_formula:
+                    worksheet.write_formula(row, col, value)
+                else:
+                    self._write_value(workbook, formats, row, col, value)
+
+        for config in self.charts:
+            ExcelModifier._add_chart(workbook, worksheet, config)
+
+    def _write_value(self, workbook: Workbook, formats: Dict[str, Any], row: int, col: int, value) -> None:
+        value, num_format = _excel_value(value)
+        if value is None:
+            return
+        if num_format is None:
+            self.worksheet.write(row, col, value)
+            return
+        if num_format not in formats:
+            formats[num_format] = workbook.add_format({'num_format': _NUM_FORMATS[num_format]})
+        self.worksheet.write(row, col, value, formats[num_format])
+
+
 class ExcelModifier:
     """Modify Excel files and add charts"""
     
@@ -35,13 +178,25 @@ class ExcelModifier:
             'add_charts': [{'sheet': 'Sheet1', 'type': 'column', 'title': 'Chart'}]
         }
         """
+        source = None
         try:
-            # Read existing Excel file if it exists
+            # Convert instructions to operations format if needed
+            operations = ExcelModifier._normalize_instructions(instructions)
+            
+            # Read existing Excel file if it exists. Only the sheets that get
+            # data appended are loaded as DataFrames; the others are copied
+            # cell for cell from the read-only workbook
             sheets = {}
             if file_path and Path(file_path).exists():
-                excel_file = pd.ExcelFile(file_path)
-                sheets = {name: pd.read_excel(excel_file, sheet_name=name)
-                         for name in excel_file.sheet_names}
+                source = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+                data_sheets = {operation.get('sheet', 'Sheet1') for operation in operations
+                               if operation['type'] == 'add_data'}
+                data_sheets = [name for name in source.sheetnames if name in data_sheets]
+                if data_sheets:
+                    # One parse for all of them. No dtype=object: pandas then
+                    # conflates equal bools and ints (True, 0, 1 -> True, 0, True)
+                    excel_file = pd.ExcelFile(source, engine='openpyxl')
+                    sheets = pd.read_excel(excel_file, sheet_name=data_sheets)
             
             # Generate output path
             if not output_path:
@@ -54,16 +209,21 @@ class ExcelModifier:
                 else:
                     output_path = outputs_dir / "new_spreadsheet.xlsx"
             
-            # Convert instructions to operations format if needed
-            operations = ExcelModifier._normalize_instructions(instructions)
-            
-            # Create new workbook with XlsxWriter
-            with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
-                workbook = writer.book
+            # Create new workbook with XlsxWriter, streaming each sheet to disk;
+            # operations are applied to sheet layouts first (see _SheetLayout)
+            with Workbook(str(output_path), {'constant_memory': True}) as workbook:
+                layouts = {}
                 
                 # Write existing sheets first
-                for sheet_name, df in sheets.items():
-                    df.to_excel(writer, sheet_name=sheet_name, index=False)
+                for sheet_name in (source.sheetnames if source else []):
+                    layout = ExcelModifier._get_sheet(workbook, layouts, sheet_name)
+                    if sheet_name in sheets:
+                        layout.add_frame(sheets[sheet_name])
+                    else:
+                        # The stored dimensions may be stale; read every row present
+                        worksheet = source[sheet_name]
+                        worksheet.reset_dimensions()
+                        layout.add_rows(worksheet.iter_rows(values_only=True))
                 
                 # Process operations
                 for operation in operations:
@@ -78,25 +238,31 @@ class ExcelModifier:
                         
                         if processed_data:
                             try:
-                                # Create DataFrame from processed data
                                 if len(processed_data) > 1 and isinstance(processed_data[0], (list, tuple)):
-                                    # First row as headers, rest as data
+                                    # First row as headers, rest as data, laid out as they are.
+                                    # Rows may be shorter than the headers, but the widest one
+                                    # must match them, as for a DataFrame built from them
                                     headers = processed_data[0]
-                                    data_rows = processed_data[1:] if len(processed_data) > 1 else []
-                                    df = pd.DataFrame(data_rows, columns=headers)
+                                    data_rows = processed_data[1:]
+                                    width = max(map(len, data_rows))
+                                    if width != len(headers):
+                                        raise ValueError(f"{len(headers)} columns passed, passed data had {width} columns")
+                                    ExcelModifier._get_sheet(workbook, layouts, sheet_name).add_rows(processed_data)
+                                    row_count = len(data_rows)
                                 else:
-                                    # Single row or no headers
+                                    # Single row or no headers: numbered columns
                                     df = pd.DataFrame(processed_data)
+                                    ExcelModifier._get_sheet(workbook, layouts, sheet_name).add_frame(df)
+                                    row_count = len(df)
                                 
-                                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                                logger.debug(f"Added sheet '{sheet_name}' with {len(df)} rows")
+                                logger.debug(f"Added sheet '{sheet_name}' with {row_count} rows")
                             except Exception as e:
-                                logger.warning(f"Error creating DataFrame for sheet '{sheet_name}': {e}")
+                                logger.warning(f"Error laying out data for sheet '{sheet_name}': {e}")
                                 # Fallback: create empty sheet
-                                worksheet = workbook.add_worksheet(sheet_name)
+                                ExcelModifier._add_sheet(workbook, layouts, sheet_name)
                         else:
                             # Create empty sheet if no data
-                            worksheet = workbook.add_worksheet(sheet_name)
+                            ExcelModifier._add_sheet(workbook, layouts, sheet_name)
                             logger.debug(f"Created empty sheet '{sheet_name}'")
                         
                     elif op_type == 'add_data':
@@ -120,9 +286,20 @@ class ExcelModifier:
                                     else:
                                         new_df = pd.DataFrame(processed_data)
                                     
-                                    # Combine DataFrames
-                                    combined_df = pd.concat([existing_df, new_df], ignore_index=True, sort=False)
-                                    combined_df.to_excel(writer, sheet_name=sheet_name, index=False)
+                                    layout = ExcelModifier._get_sheet(workbook, layouts, sheet_name)
+                                    if new_df.columns.equals(existing_df.columns) and existing_df.columns.is_unique:
+                                        # Same columns: append the new rows below the existing ones.
+                                        # The existing frame is the sheet's first layer; lay it out
+                                        # again if later operations wrote over it, as rewriting
+                                        # the combined frame did
+                                        if len(layout.layers) > 1:
+                                            layout.add_frame(existing_df)
+                                        layout.add_rows(new_df.itertuples(index=False, name=None),
+                                                        start_row=len(existing_df) + 1)
+                                    else:
+                                        # Combine DataFrames, aligning columns by name
+                                        combined_df = pd.concat([existing_df, new_df], ignore_index=True, sort=False)
+                                        layout.add_frame(combined_df)
                                 else:
                                     # Create new sheet with data
                                     if len(processed_data) > 1 and isinstance(processed_data[0], (list, tuple)):
@@ -132,7 +309,7 @@ class ExcelModifier:
                                     else:
                                         df = pd.DataFrame(processed_data)
                                     
-                                    df.to_excel(writer, sheet_name=sheet_name, index=False)
+                                    ExcelModifier._get_sheet(workbook, layouts, sheet_name).add_frame(df)
                                 
                                 logger.debug(f"Added data to sheet '{sheet_name}'")
                             except Exception as e:
@@ -142,24 +319,39 @@ class ExcelModifier:
                     
                     elif op_type == 'add_chart':
                         sheet_name = operation['sheet']
-                        if sheet_name in writer.sheets:
-                            ExcelModifier._add_chart(
-                                workbook,
-                                writer.sheets[sheet_name],
-                                operation
-                            )
+                        if sheet_name in layouts:
+                            layouts[sheet_name].charts.append(operation)
                     
                     elif op_type == 'add_formula':
                         sheet_name = operation['sheet']
-                        if sheet_name in writer.sheets:
-                            worksheet = writer.sheets[sheet_name]
-                            worksheet.write_formula(operation['cell'], operation['formula'])
+                        if sheet_name in layouts:
+                            layouts[sheet_name].add_formula(operation['cell'], operation['formula'])
+                
+                formats = {}
+                for layout in layouts.values():
+                    layout.write(workbook, formats)
             
             return str(output_path)
             
         except Exception as e:
             logger.error(f"Error modifying Excel: {str(e)}")
             raise
+        finally:
+            if source is not None:
+                source.close()
+    
+    @staticmethod
+    def _get_sheet(workbook: Workbook, layouts: Dict[str, _SheetLayout], sheet_name: str) -> _SheetLayout:
+        """Return the layout of a sheet, adding the worksheet if it does not exist yet"""
+        if sheet_name not in layouts:
+            ExcelModifier._add_sheet(workbook, layouts, sheet_name)
+        return layouts[sheet_name]
+    
+    @staticmethod
+    def _add_sheet(workbook: Workbook, layouts: Dict[str, _SheetLayout], sheet_name: str) -> _SheetLayout:
+        """Add a worksheet; raises like add_worksheet() if the name is taken"""
+        layout = layouts[sheet_name] = _SheetLayout(workbook.add_worksheet(sheet_name))
+        return layout
     
     @staticmethod
     def _normalize_instructions(instructions: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -250,6 +442,18 @@ class ExcelModifier:
             try:
                 keys = list(data[0].keys())
                 result = [keys]  # Headers
+                if keys and all(type(item) is dict for item in data):
+                    # Fast path: one C-level lookup of all keys per row; a
+                    # missing key falls back to the loop below
+                    getter = itemgetter(*keys)
+                    try:
+                        if len(keys) == 1:
+                            result.extend([getter(item)] for item in data)
+                        else:
+                            result.extend(list(getter(item)) for item in data)
+                        return result
+                    except KeyError:
+                        del result[1:]
                 for item in data:
                     if isinstance(item, dict):
                         result.append([item.get(key, '') for key in keys])
@@ -262,6 +466,9 @@ class ExcelModifier:
         
         # Handle nested lists/arrays
         if isinstance(data, list):
+            # Fast path for the usual list of row lists
+            if all(type(row) is list for row in data):
+                return list(map(list, data))
             result = []
             for row in data:
                 if isinstance(row, (list, tuple)):
@@ -283,16 +490,7 @@ class ExcelModifier:
     @staticmethod
     def _add_chart(workbook: Workbook, worksheet, config: Dict[str, Any]):
         """Add chart to worksheet"""
-        chart_type_map = {
-            'column': 'column',
-            'bar': 'bar',
-            'line': 'line',
-            'pie': 'pie',
-            'scatter': 'scatter',
-            'area': 'area',
-        }
-        
-        chart_type = chart_type_map.get(config.get('chart_type', 'column'))
+        chart_type = _CHART_TYPE_MAP.get(config.get('chart_type', 'column'))
         chart = workbook.add_chart({'type': chart_type})
         
         # Configure chart
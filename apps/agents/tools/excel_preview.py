@@ -7,6 +7,10 @@ This utility generates HTML previews from Excel documents using pandas.
 import pandas as pd
 import logging
 import numpy as np
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 import html
@@ -14,6 +18,15 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# Previews started in the background when a tool writes a workbook, claimed
+# by path when the file is registered as an artifact
+_PREVIEW_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix='excel-preview')
+_PENDING_PREVIEWS = OrderedDict()
+_PENDING_PREVIEWS_LOCK = threading.Lock()
+
+# Unclaimed previews kept at most; the oldest are dropped first
+_MAX_PENDING_PREVIEWS = 64
+
 
 class ExcelPreviewGenerator:
     """Generate HTML previews from Excel documents"""
@@ -107,6 +120,53 @@ class ExcelPreviewGenerator:
                 'preview_html': None
             }
     
+    @staticmethod
+    def submit_preview(file_path: str) -> None:
+        """Start generating the preview of a file in the background; get_preview() collects it"""
+        future = _PREVIEW_POOL.submit(ExcelPreviewGenerator.generate_preview, file_path)
+        ExcelPreviewGenerator._add_pending(file_path, future)
+    
+    @staticmethod
+    def skip_preview(file_path: str, reason: str) -> None:
+        """Record that no preview is wanted for a file; get_preview() reports it as skipped"""
+        future = Future()
+        future.set_result({
+            'success': False,
+            'skipped': True,
+            'error': reason,
+            'preview_html': None
+        })
+        ExcelPreviewGenerator._add_pending(file_path, future)
+    
+    @staticmethod
+    def _add_pending(file_path: str, future: Future) -> None:
+        """Register the preview result a later get_preview() call collects"""
+        key = os.path.normcase(os.path.abspath(file_path))
+        with _PENDING_PREVIEWS_LOCK:
+            _PENDING_PREVIEWS[key] = future
+            _PENDING_PREVIEWS.move_to_end(key)
+            while len(_PENDING_PREVIEWS) > _MAX_PENDING_PREVIEWS:
+                _PENDING_PREVIEWS.popitem(last=False)
+    
+    @staticmethod
+    def get_preview(file_path: str) -> Dict[str, Any]:
+        """
+        Return the preview of a file, as generate_preview() does
+        
+        Waits for the background preview started by submit_preview() if there
+        is one, returns the skipped result recorded by skip_preview(),
+        otherwise generates it now.
+        """
+        key = os.path.normcase(os.path.abspath(file_path))
+        with _PENDING_PREVIEWS_LOCK:
+            future = _PENDING_PREVIEWS.pop(key, None)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as e:
+                logger.warning(f"Background preview failed for {file_path}: {str(e)}")
+        return ExcelPreviewGenerator.generate_preview(file_path)
+    
     @staticmethod
     def _generate_sheet_html(df: pd.DataFrame, sheet_name: str, is_truncated: bool, is_multi_sheet: bool) -> str:
         """Generate HTML for a single sheet"""
@@ -0,0 +1,218 @@
+"""
+Fast XLSX Writer
+
+Writes plain tabular workbooks by emitting the SpreadsheetML parts directly
+into the zip archive, without building openpyxl cells. Only values and an
+optional bold header row are supported: no charts, merged cells or widths.
+Strings go to the shared string table, so repeated headers and categories
+are stored once for the whole workbook.
+"""
+
+import math
+import zipfile
+from itertools import chain
+from typing import Any, Dict, Iterable, List
+from xml.sax.saxutils import escape, quoteattr
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+
+# Rows serialized before the buffer is flushed to the archive
+_FLUSH_ROWS = 1000
+
+_CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+)
+_CONTENT_TYPES_SHEET = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+)
+
+_WORKBOOK_RELS_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+)
+_WORKBOOK_RELS_SHEET = (
+    '<Relationship Id="rId{index}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{index}.xml"/>'
+)
+
+# Cell format 0 is the default, 1 the header look of the other generators:
+# bold, centered, thin border
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '</fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="2"><border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>'
+    '</borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" applyFont="1" applyBorder="1" '
+    'applyAlignment="1"><alignment horizontal="center"/></xf>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHARED_STRINGS_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" uniqueCount="{unique}">'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+class _SharedStrings(dict):
+    """Index of the workbook's strings, in first-seen order; a new string gets the next index"""
+
+    def __missing__(self, value: str) -> int:
+        index = self[value] = len(self)
+        return index
+
+    def to_xml(self) -> str:
+        parts = [_SHARED_STRINGS_HEAD.format(unique=len(self))]
+        for value in self:
+            text = escape(ILLEGAL_CHARACTERS_RE.sub('', value))
+            parts.append(f'<si><t xml:space="preserve">{text}</t></si>')
+        parts.append('</sst>')
+        return ''.join(parts)
+
+
+def _cell_xml(ref: str, value: Any, style: str, shared: _SharedStrings) -> str:
+    """Serialize one cell; None gives an empty string (no cell written)"""
+    value_type = type(value)
+    if value_type is str:
+        return f'<c r="{ref}"{style} t="s"><v>{shared[value]}</v></c>'
+    if value_type is int:
+        return f'<c r="{ref}"{style}><v>{value}</v></c>'
+    if value_type is float:
+        if not math.isfinite(value):
+            return f'<c r="{ref}"{style} t="e"><v>#NUM!</v></c>'
+        return f'<c r="{ref}"{style}><v>{value!r}</v></c>'
+    if value_type is bool:
+        return f'<c r="{ref}"{style} t="b"><v>{int(value)}</v></c>'
+    if value is None:
+        return ''
+    return _cell_xml(ref, str(value), style, shared)
+
+
+def _write_sheet(archive: zipfile.ZipFile, index: int, headers: List[Any], rows: Iterable[Any],
+                 shared: _SharedStrings) -> None:
+    """
+    Stream one worksheet part into the archive
+
+    Dict rows are matched to the headers by key, as pd.DataFrame(rows,
+    columns=headers) does; without headers the keys of the first row are used.
+    """
+    columns = []
+    rows = iter(rows)
+    if not headers:
+        first_row = next(rows, None)
+        if isinstance(first_row, dict):
+            headers = list(first_row)
+        if first_row is not None:
+            rows = chain((first_row,), rows)
+    with archive.open(f'xl/worksheets/sheet{index}.xml', 'w') as part:
+        part.write(_SHEET_HEAD.encode('utf-8'))
+        buffer = []
+        row_number = 0
+        if headers:
+            row_number = 1
+            columns = [get_column_letter(i) for i in range(1, len(headers) + 1)]
+            cells = ''.join(_cell_xml(f'{columns[i]}1', value, ' s="1"', shared) for i, value in enumerate(headers))
+            buffer.append(f'<row r="1">{cells}</row>')
+        for row in rows:
+            row_number += 1
+            if isinstance(row, dict):
+                row = [row.get(key) for key in headers] if headers else list(row.values())
+            elif not isinstance(row, (list, tuple)):
+                row = [row]
+            while len(columns) < len(row):
+                columns.append(get_column_letter(len(columns) + 1))
+            cells = ''.join(
+                _cell_xml(f'{columns[i]}{row_number}', value, '', shared) for i, value in enumerate(row)
+            )
+            buffer.append(f'<row r="{row_number}">{cells}</row>')
+            if len(buffer) >= _FLUSH_ROWS:
+                part.write(''.join(buffer).encode('utf-8'))
+                buffer.clear()
+        buffer.append(_SHEET_TAIL)
+        part.write(''.join(buffer).encode('utf-8'))
+
+
+def write_simple_xlsx(path: str, sheets: List[Dict[str, Any]]) -> None:
+    """
+    Write a values-only workbook
+
+    Args:
+        path: Output .xlsx path
+        sheets: One dict per worksheet with 'name', 'rows' (lists, dicts or
+            scalars, one per row) and optional 'headers' written as a bold row.
+            Dict rows are written in header order; without 'headers', the
+            keys of a first dict row become the header row
+    """
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        content_types = [_CONTENT_TYPES_HEAD]
+        workbook = [_WORKBOOK_HEAD]
+        workbook_rels = [_WORKBOOK_RELS_HEAD]
+        shared = _SharedStrings()
+        for index, sheet in enumerate(sheets, 1):
+            _write_sheet(archive, index, sheet.get('headers'), sheet.get('rows') or [], shared)
+            content_types.append(_CONTENT_TYPES_SHEET.format(index=index))
+            workbook.append(f'<sheet name={quoteattr(sheet["name"])} sheetId="{index}" r:id="rId{index}"/>')
+            workbook_rels.append(_WORKBOOK_RELS_SHEET.format(index=index))
+        styles_id = len(sheets) + 1
+        workbook_rels.append(
+            f'<Relationship Id="rId{styles_id}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>'
+            f'<Relationship Id="rId{styles_id + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+            'Target="sharedStrings.xml"/>'
+        )
+        content_types.append('</Types>')
+        workbook.append('</sheets></workbook>')
+        workbook_rels.append('</Relationships>')
+
+        archive.writestr('[Content_Types].xml', ''.join(content_types))
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', ''.join(workbook))
+        archive.writestr('xl/_rels/workbook.xml.rels', ''.join(workbook_rels))
+        archive.writestr('xl/styles.xml', _STYLES)
+        archive.writestr('xl/sharedStrings.xml', shared.to_xml())
@@ -0,0 +1,95 @@
+"""
+Parallel Tools Tool for SmolAgents
+
+This tool allows the agent to run several independent tool calls concurrently,
+e.g. parsing multiple documents in one step instead of one after the other.
+"""
+
+from smolagents import Tool
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ParallelToolsTool(Tool):
+    """
+    A tool that dispatches independent tool calls to a bounded thread pool.
+
+    Each call is isolated: a failing call yields an error string in its slot
+    of the result list instead of aborting the other calls.
+    """
+
+    name = "run_tools_in_parallel"
+    description = """
+    Run several INDEPENDENT tool calls at the same time and get all their results.
+    Only use it when no call needs the output of another one (e.g. parsing several documents).
+
+    Usage: run_tools_in_parallel(calls=[{"tool": "tool_name", "arguments": {...}}, ...])
+
+    Example - Parse two documents at once:
+    results = run_tools_in_parallel(calls=[
+        {"tool": "parse_excel", "arguments": {"file_path": "sales.xlsx"}},
+        {"tool": "ai_pdf_analysis", "arguments": {"file_path": "report.pdf", "query": "Summarize the report"}}
+    ])
+
+    Returns: a list with one result per call, in the same order as the calls.
+    Failed calls return a string starting with "Error".
+    """
+
+    inputs = {
+        "calls": {
+            "type": "array",
+            "description": "List of {\"tool\": name, \"arguments\": {...}} dictionaries"
+        }
+    }
+
+    output_type = "array"
+
+    def __init__(self, tools: List[Tool] = None, max_workers: int = 1):
+        """Initialize with the tools that may be dispatched and the concurrency limit"""
+        super().__init__()
+        self.tools_by_name = {tool.name: tool for tool in (tools or []) if tool.name != self.name}
+        self.max_workers = max(1, max_workers)
+
+    def forward(self, calls: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Execute the given tool calls concurrently.
+
+        Args:
+            calls (List[Dict[str, Any]]): Tool names and keyword arguments
+
+        Returns:
+            List[Any]: Result (or error string) of each call, in call order
+        """
+        if not isinstance(calls, (list, tuple)) or not calls:
+            return ["Error: calls must be a non-empty list of {\"tool\": name, \"arguments\": {...}}"]
+
+        workers = min(self.max_workers, len(calls))
+        logger.debug(f"Running {len(calls)} tool calls on {workers} threads")
+
+        if workers == 1:
+            return [self._run_call(call) for call in calls]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._run_call, calls))
+
+    def _run_call(self, call: Any) -> Any:
+        """Run a single call, turning any failure into an error observation"""
+        if not isinstance(call, dict):
+            return f"Error: invalid call {call!r}, expected a dictionary"
+
+        tool_name = call.get('tool')
+        tool = self.tools_by_name.get(tool_name)
+        if tool is None:
+            return f"Error: unknown tool '{tool_name}'. Available tools: {', '.join(self.tools_by_name)}"
+
+        arguments = call.get('arguments') or {}
+        if not isinstance(arguments, dict):
+            return f"Error: arguments for '{tool_name}' must be a dictionary"
+
+        try:
+            return tool(**arguments)
+        except Exception as e:
+            logger.warning(f"Parallel call to {tool_name} failed: {e}")
+            return f"Error running {tool_name}: {str(e)}"
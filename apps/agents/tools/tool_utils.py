@@ -5,13 +5,50 @@ Utility functions for SmolAgents tools to improve robustness and error handling.
 import json
 import re
 import logging
+from itertools import islice
 from typing import Dict, Any, Union, Optional, List
 from pathlib import Path
 import jsonschema
 from jsonschema import validate, ValidationError
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+
+def _json_loads(text: str) -> Any:
+    """
+    Parse JSON with orjson when it is installed, stdlib json otherwise.
+    
+    orjson parses the large nested row lists tools receive several times
+    faster. It rejects a few inputs the stdlib accepts (NaN literals,
+    integers beyond 64 bits), which are retried with json.loads so the
+    result never depends on which parser is installed. Errors are
+    json.JSONDecodeError in both cases.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
+def _json_dumps(obj: Any) -> str:
+    """
+    Serialize a tool result to JSON text, with orjson when it is installed.
+    
+    Non-ASCII characters are kept as-is by both encoders.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
+
+
 class ToolInputSanitizer:
     """Handles robust JSON input parsing and validation for tools."""
     
@@ -38,7 +75,7 @@ class ToolInputSanitizer:
         
         # If it's already a valid JSON string, return as-is
         try:
-            json.loads(cleaned)
+            _json_loads(cleaned)
             return cleaned
         except json.JSONDecodeError:
             pass
@@ -97,14 +134,14 @@ class ToolInputSanitizer:
         
         # Strategy 1: Direct JSON loads
         try:
-            return json.loads(input_data)
+            return _json_loads(input_data)
         except json.JSONDecodeError as e:
             logger.debug(f"Direct JSON parsing failed: {e}")
         
         # Strategy 2: Sanitize then parse
         try:
             sanitized = ToolInputSanitizer.sanitize_json_input(input_data)
-            return json.loads(sanitized)
+            return _json_loads(sanitized)
         except json.JSONDecodeError as e:
             logger.debug(f"Sanitized JSON parsing failed: {e}")
         
@@ -122,7 +159,7 @@ class ToolInputSanitizer:
         try:
             # Replace True/False/None with JSON equivalents
             fixed = input_data.replace('True', 'true').replace('False', 'false').replace('None', 'null')
-            return json.loads(fixed)
+            return _json_loads(fixed)
         except json.JSONDecodeError as e:
             logger.debug(f"Fixed JSON parsing failed: {e}")
         
@@ -154,7 +191,8 @@ class ToolValidator:
                                             'items': {'type': 'array'}
                                         },
                                         'headers': {'type': 'array'},
-                                        'title': {'type': 'string'}
+                                        'title': {'type': 'string'},
+                                        'coerce_numeric': {'type': 'boolean'}
                                     }
                                 }
                             },
@@ -162,7 +200,9 @@ class ToolValidator:
                         },
                         'required': ['name']
                     }
-                }
+                },
+                'engine': {'type': 'string', 'enum': ['openpyxl', 'xlsxwriter']},
+                'preview': {'type': 'boolean'}
             },
             'required': ['sheets']
         },
@@ -347,10 +387,12 @@ class FileVerifier:
                 wb = openpyxl.load_workbook(file_path, read_only=True)
                 result['sheets'] = wb.sheetnames
                 
-                # Check if sheets have data
+                # Check if sheets have data. Streamed (write-only) workbooks carry no
+                # dimension, so look at the first two rows instead of max_row
                 for sheet_name in wb.sheetnames:
                     ws = wb[sheet_name]
-                    if ws.max_row > 1 or (ws.max_row == 1 and any(cell.value for cell in ws[1])):
+                    first_rows = list(islice(ws.iter_rows(values_only=True), 2))
+                    if len(first_rows) > 1 or (first_rows and any(first_rows[0])):
                         result['has_data'] = True
                         break
                 
@@ -425,11 +467,14 @@ class DebugLogger:
     def log_tool_start(tool_name: str, inputs: Dict[str, Any]):
         """Log the start of tool operation."""
         logger.info(f"[{tool_name}] Starting tool execution")
-        logger.debug(f"[{tool_name}] Inputs: {str(inputs)[:200]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[{tool_name}] Inputs: {str(inputs)[:200]}...")
     
     @staticmethod
     def log_json_parsing(tool_name: str, raw_input: str, parsed_result: Any):
         """Log JSON parsing details."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         logger.debug(f"[{tool_name}] JSON parsing - Input length: {len(raw_input)}")
         logger.debug(f"[{tool_name}] JSON parsing - Result type: {type(parsed_result)}")
         if isinstance(parsed_result, dict):
@@ -3,4 +3,10 @@ from django.apps import AppConfig
 
 class ChatConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.chat'
\ No newline at end of file
+    name = 'apps.chat'
+    
+    def ready(self):
+        """
+        Import signal handlers when the app is ready
+        """
+        import apps.chat.signals  # noqa F401
@@ -2,9 +2,9 @@ from django.http import FileResponse, HttpResponse, Http404
 from django.core.files.storage import default_storage
 from django.conf import settings
 from django.utils.encoding import smart_str
+from apps.chat.mime import EXT_MIME, mime_for_suffix
 from apps.chat.models import Artifact
 from pathlib import Path
-import mimetypes
 import logging
 import os
 
@@ -112,29 +112,9 @@ class ArtifactDownloader:
         if stored_type and stored_type != 'application/octet-stream':
             return stored_type
         
-        # Guess from file extension
-        guessed_type, _ = mimetypes.guess_type(str(file_path))
-        if guessed_type:
-            return guessed_type
-        
-        # Extension-based mapping for common types
-        ext = file_path.suffix.lower()
-        type_mapping = {
-            '.pdf': 'application/pdf',
-            '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.svg': 'image/svg+xml',
-            '.csv': 'text/csv',
-            '.txt': 'text/plain',
-            '.json': 'application/json',
-            '.html': 'text/html',
-            '.zip': 'application/zip'
-        }
-        
-        return type_mapping.get(ext, 'application/octet-stream')
+        # Extension-based mapping for the types artifacts are generated with,
+        # then the mimetypes database for anything else
+        return mime_for_suffix(file_path.suffix.lower())
 
 
 class SecureFileDownloader:
@@ -193,13 +173,14 @@ class ChartDownloader:
     @staticmethod
     def download_chart(chart_path: str, chart_name: str = None) -> FileResponse:
         """Download chart image"""
+        suffix = Path(chart_path).suffix.lower() or '.png'
         if not chart_name:
-            chart_name = f"chart_{Path(chart_path).stem}.png"
+            chart_name = f"chart_{Path(chart_path).stem}{suffix}"
         
         return SecureFileDownloader.download_file(
             file_path=chart_path,
             filename=chart_name,
-            content_type='image/png'
+            content_type=EXT_MIME.get(suffix, 'image/png')
         )
 
 
@@ -0,0 +1,38 @@
+"""
+Content types of generated artifacts
+
+Shared by the orchestrator when it registers artifacts, the Celery tasks
+and the download views, so a file gets the same MIME type everywhere.
+"""
+
+import mimetypes
+from functools import lru_cache
+from types import MappingProxyType
+
+# MIME types for the extensions artifacts are usually generated with
+EXT_MIME = MappingProxyType({
+    '.pdf': 'application/pdf',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.xls': 'application/vnd.ms-excel',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.doc': 'application/msword',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.svg': 'image/svg+xml',
+    '.webp': 'image/webp',
+    '.csv': 'text/csv',
+    '.txt': 'text/plain',
+    '.json': 'application/json',
+    '.xml': 'application/xml',
+    '.html': 'text/html',
+    '.zip': 'application/zip',
+    '.md': 'text/markdown'
+})
+
+
+@lru_cache(maxsize=64)
+def mime_for_suffix(suffix: str) -> str:
+    """Resolve a MIME type from a lowercase file suffix, falling back to mimetypes"""
+    return EXT_MIME.get(suffix) or mimetypes.guess_type('x' + suffix)[0] or 'application/octet-stream'
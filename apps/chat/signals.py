@@ -0,0 +1,21 @@
+"""
+Signal handlers for the chat app
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Message
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def invalidate_conversation_history(sender, instance, **kwargs):
+    """Invalidate the orchestrator's cached history when a message changes"""
+    # Saves that only touch metadata (e.g. artifacts) do not affect the history
+    update_fields = kwargs.get('update_fields')
+    if update_fields and not {'role', 'content'} & set(update_fields):
+        return
+    
+    from apps.agents.orchestrator import invalidate_history
+    invalidate_history(instance.conversation_id)
@@ -186,6 +186,12 @@ MAX_DOCUMENTS_PER_SESSION = 20
 
 # Conversation History Settings
 MAX_CONVERSATION_HISTORY = 10  # Number of previous messages to include in LLM context
+CONVERSATION_HISTORY_TOKEN_BUDGET = 2000  # Approximate prompt tokens the history may use (oldest messages are dropped first)
+
+# Agent Settings
+TOOL_CONCURRENCY_LIMIT = config('TOOL_CONCURRENCY_LIMIT', default=1, cast=int)  # >1 lets the agent run independent tool calls in parallel
+AGENT_TEMP_WATCHER = config('AGENT_TEMP_WATCHER', default=True, cast=bool)  # Track generated files with filesystem events (watchdog) instead of directory walks
+AGENT_RESULT_CACHE = config('AGENT_RESULT_CACHE', default=False, cast=bool)  # Reuse the response of an identical prompt for 5 minutes instead of rerunning the agent
 
 # Session Configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
@@ -1,6 +1,7 @@
 from celery import shared_task
 from django.utils import timezone
 from apps.agents.orchestrator import ChatbotOrchestrator
+from apps.chat.mime import mime_for_suffix
 from apps.chat.models import Message, Artifact
 from apps.documents.models import DocumentContext
 import logging
@@ -136,23 +137,7 @@ def _process_artifact(artifact_data: Dict[str, Any], message: Message, session_i
 
 def _get_file_type(file_path: Path) -> str:
     """Determine MIME type from file extension"""
-    ext = file_path.suffix.lower()
-    
-    type_mapping = {
-        '.pdf': 'application/pdf',
-        '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        '.png': 'image/png',
-        '.jpg': 'image/jpeg',
-        '.jpeg': 'image/jpeg',
-        '.svg': 'image/svg+xml',
-        '.csv': 'text/csv',
-        '.txt': 'text/plain',
-        '.json': 'application/json',
-        '.html': 'text/html'
-    }
-    
-    return type_mapping.get(ext, 'application/octet-stream')
+    return mime_for_suffix(file_path.suffix.lower())
 
 
 @shared_task(bind=True, max_retries=2)
@@ -8,6 +8,8 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.conf import settings
 from unittest.mock import patch, MagicMock
 import io
+from datetime import timedelta
+from django.utils import timezone
 from apps.documents.models import DocumentSession, Document, DocumentContext
 from apps.chat.models import Conversation, Message, Artifact
 from apps.documents.session_manager import SessionManager
@@ -62,6 +64,7 @@ def test_session():
     session = Session.objects.create(
         session_key='test_session_key_12345',
         session_data='{}',
+        expire_date=timezone.now() + timedelta(hours=2)
     )
     yield session
     session.delete()
@@ -247,7 +250,8 @@ class BaseTestCase(TestCase):
         # Create test session
         self.session = Session.objects.create(
             session_key='test_session_12345',
-            session_data='{}'
+            session_data='{}',
+            expire_date=timezone.now() + timedelta(hours=2)
         )
         
         # Create document session
@@ -264,9 +268,7 @@ class BaseTestCase(TestCase):
         
         # Set up test client with session
         self.client = Client()
-        session = self.client.session
-        session.session_key = self.session.session_key
-        session.save()
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = self.session.session_key
     
     def tearDown(self):
         """Clean up test environment"""
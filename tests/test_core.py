@@ -1,9 +1,18 @@
+import asyncio
+import json
+import os
 import pytest
 import tempfile
+import threading
+import time
+import uuid
+import zipfile
 import shutil
 from pathlib import Path
 from unittest.mock import patch, MagicMock, mock_open
+from django.db import DatabaseError
 from django.test import TestCase
+import openpyxl
 import pandas as pd
 import matplotlib.pyplot as plt
 from tests.conftest import BaseTestCase, TestFileGenerator
@@ -13,10 +22,20 @@ from apps.documents.parsers.pdf_parser import PDFParser, PDFContent
 from apps.documents.parsers.excel_parser import ExcelParser, ExcelContent
 from apps.documents.parsers.word_parser import WordParser, WordContent
 from apps.agents.tools.chart_generator import ChartGenerator
+from apps.agents.tools import excel_generator
+from apps.agents.tools.excel_generator import SimpleExcelGeneratorTool
+from apps.agents.tools.excel_generator_tool import ExcelGeneratorTool
 from apps.agents.tools.excel_modifier import ExcelModifier
+from apps.agents.tools.fast_xlsx import write_simple_xlsx
+from apps.agents.tools.parallel_tools_tool import ParallelToolsTool
 from apps.agents.tools.word_modifier import WordModifier
 from apps.agents.registry import ToolRegistry, ToolDefinition
-from apps.agents.orchestrator import ChatbotOrchestrator
+from apps.agents.orchestrator import ChatbotOrchestrator, _RESULT_CACHE, _TEMP_DIR_ABS
+from apps.agents.cache import ExactCache
+from apps.agents.temp_tracker import TempDirTracker, WATCHDOG_AVAILABLE
+from apps.chat.mime import EXT_MIME, mime_for_suffix
+from apps.chat.models import Artifact, Message
+from tasks.agent_tasks import _get_file_type
 
 
 class TestDocumentParsers(BaseTestCase):
@@ -386,6 +405,25 @@ class TestExcelModifier(BaseTestCase):
         df = pd.read_excel(output_path, sheet_name='Sheet1')
         self.assertEqual(len(df), 5)  # Original 3 + new 2 rows
     
+    def test_modify_excel_add_data_keeps_integers_next_to_bools(self):
+        """Test that appending data does not turn 1/0 cells of a bool column into bools"""
+        source = self.test_dir / "flags.xlsx"
+        workbook = openpyxl.Workbook()
+        workbook.active.title = 'Sheet1'
+        for row in [['flag'], [True], [0], [1], [False]]:
+            workbook.active.append(row)
+        workbook.save(source)
+        
+        output_path = ExcelModifier.modify_excel(
+            str(source),
+            {'operations': [{'type': 'add_data', 'sheet': 'Sheet1', 'data': [['flag'], [2]]}]},
+            output_path=str(self.test_dir / "flags_out.xlsx")
+        )
+        
+        values = [row[0] for row in openpyxl.load_workbook(output_path).active.iter_rows(min_row=2, values_only=True)]
+        self.assertEqual(values, [1, 0, 1, 0, 2])
+        self.assertNotIsInstance(values[2], bool)
+    
     def test_modify_excel_add_formula(self):
         """Test adding formula to Excel file"""
         instructions = {
@@ -406,6 +444,67 @@ class TestExcelModifier(BaseTestCase):
         
         self.assertTrue(Path(output_path).exists())
     
+    def _modify_rows(self, operations):
+        """Apply operations to the sample file and return the rows of every output sheet"""
+        output_path = ExcelModifier.modify_excel(
+            str(self.sample_file),
+            {'operations': operations},
+            output_path=str(self.test_dir / "layered.xlsx")
+        )
+        workbook = openpyxl.load_workbook(output_path)
+        return {sheet.title: list(sheet.iter_rows(values_only=True)) for sheet in workbook.worksheets}
+    
+    def test_later_operations_overwrite_added_sheet(self):
+        """Test add_sheet, then formulas, then add_data on the same sheet"""
+        rows = self._modify_rows([
+            {'type': 'add_sheet', 'name': 'Report', 'data': [['Item', 'Qty'], ['a', 1], ['b', 2]]},
+            {'type': 'add_formula', 'sheet': 'Report', 'cell': 'C2', 'formula': '=B2*2'},
+            {'type': 'add_formula', 'sheet': 'Report', 'cell': 'B3', 'formula': '=1+1'},
+            {'type': 'add_formula', 'sheet': 'Report', 'cell': 'A1', 'formula': '="x"'},
+            {'type': 'add_data', 'sheet': 'Report', 'data': [['Item', 'Qty', 'Note'], ['c', 3, None]]},
+        ])
+        
+        # add_data rewrites the sheet from A1; its blank Note cell keeps the formula below it
+        self.assertEqual(rows['Report'], [
+            ('Item', 'Qty', 'Note'),
+            ('c', 3, '=B2*2'),
+            ('b', '=1+1', None),
+        ])
+        self.assertEqual(rows['Sheet1'], [('A', 'B'), (1, 4), (2, 5), (3, 6)])
+    
+    def test_add_data_overwrites_earlier_formulas(self):
+        """Test that appended data is laid over formulas written before it"""
+        rows = self._modify_rows([
+            {'type': 'add_formula', 'sheet': 'Sheet1', 'cell': 'A2', 'formula': '=10'},
+            {'type': 'add_formula', 'sheet': 'Sheet1', 'cell': 'C3', 'formula': '=20'},
+            {'type': 'add_data', 'sheet': 'Sheet1', 'data': [['A', 'B'], [7, 8]]},
+        ])
+        
+        self.assertEqual(rows['Sheet1'], [
+            ('A', 'B', None),
+            (1, 4, None),
+            (2, 5, '=20'),
+            (3, 6, None),
+            (7, 8, None),
+        ])
+    
+    def test_repeated_add_data_around_formula(self):
+        """Test add_data, then a formula, then add_data with other columns"""
+        rows = self._modify_rows([
+            {'type': 'add_data', 'sheet': 'Sheet1', 'data': [['A', 'B'], [7, 8]]},
+            {'type': 'add_formula', 'sheet': 'Sheet1', 'cell': 'B5', 'formula': '=SUM(B2:B4)'},
+            {'type': 'add_data', 'sheet': 'Sheet1', 'data': [['A', 'C'], [9, None]]},
+        ])
+        
+        # Each add_data combines with the sheet as read from the input file
+        self.assertEqual(rows['Sheet1'], [
+            ('A', 'B', 'C'),
+            (1, 4, None),
+            (2, 5, None),
+            (3, 6, None),
+            (9, '=SUM(B2:B4)', None),
+        ])
+    
     def test_modify_excel_error_handling(self):
         """Test Excel modifier error handling"""
         with self.assertRaises(Exception):
@@ -415,6 +514,179 @@ class TestExcelModifier(BaseTestCase):
             )
 
 
+class TestFastXlsxWriter(TestCase):
+    """Test the raw SpreadsheetML writer"""
+    
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.path = str(self.test_dir / "export.xlsx")
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_values_round_trip(self):
+        write_simple_xlsx(self.path, [{
+            'name': 'Data',
+            'headers': ['Name', 'Count', 'Ratio', 'Flag'],
+            'rows': [
+                ['a', 1, 0.5, True],
+                ['b', None, float('inf'), False],
+                'scalar',
+            ],
+        }])
+        
+        sheet = openpyxl.load_workbook(self.path)['Data']
+        self.assertEqual(list(sheet.iter_rows(values_only=True)), [
+            ('Name', 'Count', 'Ratio', 'Flag'),
+            ('a', 1, 0.5, True),
+            ('b', None, '#NUM!', False),
+            ('scalar', None, None, None),
+        ])
+        self.assertTrue(sheet['A1'].font.b)
+        self.assertFalse(sheet['A2'].font.b)
+    
+    def test_dict_rows_matched_to_headers_by_key(self):
+        write_simple_xlsx(self.path, [{
+            'name': 'Data',
+            'headers': ['v', 'name', 'missing'],
+            'rows': [{'name': 'a', 'v': 1}, {'v': 2, 'name': 'b', 'extra': 'x'}],
+        }])
+        
+        sheet = openpyxl.load_workbook(self.path)['Data']
+        self.assertEqual(list(sheet.iter_rows(values_only=True)), [
+            ('v', 'name', 'missing'),
+            (1, 'a', None),
+            (2, 'b', None),
+        ])
+    
+    def test_dict_keys_become_headers(self):
+        write_simple_xlsx(self.path, [{
+            'name': 'Data',
+            'rows': [{'name': 'a', 'v': 1}, {'v': 2, 'name': 'b'}],
+        }])
+        
+        sheet = openpyxl.load_workbook(self.path)['Data']
+        self.assertEqual(list(sheet.iter_rows(values_only=True)), [
+            ('name', 'v'),
+            ('a', 1),
+            ('b', 2),
+        ])
+        self.assertTrue(sheet['A1'].font.b)
+    
+    def test_sheet_names_and_text_are_escaped(self):
+        write_simple_xlsx(self.path, [
+            {'name': 'R&D "<1>"', 'rows': [['<b>&</b>', 'bell\x07']]},
+            {'name': 'Empty', 'rows': []},
+        ])
+        
+        workbook = openpyxl.load_workbook(self.path)
+        self.assertEqual(workbook.sheetnames, ['R&D "<1>"', 'Empty'])
+        self.assertEqual(workbook['R&D "<1>"']['A1'].value, '<b>&</b>')
+        self.assertEqual(workbook['R&D "<1>"']['B1'].value, 'bell')
+        self.assertEqual(workbook['Empty'].max_row, 1)
+    
+    def test_repeated_strings_stored_once(self):
+        rows = [['north' if i % 2 else 'south', i] for i in range(2500)]
+        write_simple_xlsx(self.path, [{'name': 'Sales', 'headers': ['Region', 'Amount'], 'rows': rows}])
+        
+        with zipfile.ZipFile(self.path) as archive:
+            shared_strings = archive.read('xl/sharedStrings.xml').decode('utf-8')
+        self.assertIn('uniqueCount="4"', shared_strings)
+        sheet = openpyxl.load_workbook(self.path, read_only=True)['Sales']
+        values = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(len(values), 2501)
+        self.assertEqual(values[-1], ('north', 2499))
+
+
+class TestSimpleExcelGeneratorTool(TestCase):
+    """Test the quick data export tool"""
+    
+    def _export_rows(self, data, headers=''):
+        result = SimpleExcelGeneratorTool().forward(data, headers, f"export_{uuid.uuid4().hex}")
+        self.assertTrue(result.startswith("Simple Excel file created successfully: "), result)
+        output_path = result.split(': ', 1)[1]
+        self.addCleanup(os.remove, output_path)
+        return list(openpyxl.load_workbook(output_path).active.iter_rows(values_only=True))
+    
+    def test_list_rows_with_headers(self):
+        rows = self._export_rows('[["a", 1], ["b", 2]]', '["name", "v"]')
+        
+        self.assertEqual(rows, [('name', 'v'), ('a', 1), ('b', 2)])
+    
+    def test_dict_rows_use_keys_as_headers(self):
+        rows = self._export_rows('[{"name": "a", "v": 1}, {"v": 2, "name": "b", "note": "x"}]')
+        
+        self.assertEqual(rows, [('name', 'v', 'note'), ('a', 1, None), ('b', 2, 'x')])
+    
+    def test_dict_rows_matched_to_given_headers(self):
+        rows = self._export_rows('[{"name": "a", "v": 1}, {"v": 2, "name": "b"}]', '["v", "name"]')
+        
+        self.assertEqual(rows, [('v', 'name'), (1, 'a'), (2, 'b')])
+
+
+class TestExcelGeneratorTool(TestCase):
+    """Test workbook generation from a JSON structure"""
+    
+    def _generate(self, structure):
+        result = ExcelGeneratorTool().forward(json.dumps(structure), f"generated_{uuid.uuid4().hex}")
+        self.assertTrue(result.startswith("Excel file created successfully: "), result)
+        output_path = result.split(': ', 1)[1]
+        self.addCleanup(os.remove, output_path)
+        return openpyxl.load_workbook(output_path)
+    
+    def test_empty_structure_gets_sample_sheet(self):
+        for structure in ({'sheets': []}, {}):
+            workbook = self._generate(structure)
+            
+            self.assertEqual(workbook.sheetnames, ['Data'])
+            self.assertEqual(
+                list(workbook['Data'].iter_rows(values_only=True))[0],
+                ('Item', 'Value', 'Category')
+            )
+    
+    def test_no_default_sheet_next_to_configured_sheets(self):
+        workbook = self._generate({'sheets': [
+            {'name': 'Sales', 'tables': [{'data': [['Region', 'Amount'], ['North', 10]]}]},
+        ]})
+        
+        self.assertEqual(workbook.sheetnames, ['Sales'])
+        self.assertEqual(
+            list(workbook['Sales'].iter_rows(values_only=True)),
+            [('Region', 'Amount'), ('North', 10)]
+        )
+
+
+class TestExcelGeneratorEngines(TestCase):
+    """Test that both Excel generator engines produce the same sheets"""
+    
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.tool = excel_generator.ExcelGeneratorTool()
+    
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _sheets(self, save, structure):
+        output_path = str(self.test_dir / f"{save.__name__}.xlsx")
+        save(structure, output_path)
+        workbook = openpyxl.load_workbook(output_path)
+        return {sheet.title: list(sheet.iter_rows(values_only=True)) for sheet in workbook.worksheets}
+    
+    def test_duplicate_sheet_names_renamed_by_both_engines(self):
+        structure = {'sheets': [
+            {'name': 'Sales', 'tables': [{'data': [['Region', 'Amount'], ['North', 10]]}]},
+            {'name': 'Sales', 'tables': [{'data': [['Region', 'Amount'], ['South', 20]]}]},
+            {'name': 'sales', 'tables': [{'data': [['Region', 'Amount'], ['East', 30]]}]},
+        ]}
+        
+        openpyxl_sheets = self._sheets(self.tool._save_with_openpyxl, structure)
+        xlsxwriter_sheets = self._sheets(self.tool._save_with_xlsxwriter, structure)
+        
+        self.assertEqual(list(openpyxl_sheets), ['Sales', 'Sales1', 'sales2'])
+        self.assertEqual(xlsxwriter_sheets, openpyxl_sheets)
+        self.assertEqual(xlsxwriter_sheets['Sales1'][1], ('South', 20))
+
+
 class TestWordModifier(BaseTestCase):
     """Test Word modification functionality"""
     
@@ -510,6 +782,75 @@ class TestWordModifier(BaseTestCase):
             WordModifier.modify_word(None, {'operations': []})
 
 
+class TestParallelToolsTool(TestCase):
+    """Test concurrent dispatch of independent tool calls"""
+    
+    def _tool(self, name, side_effect=None, return_value=None):
+        tool = MagicMock(side_effect=side_effect, return_value=return_value)
+        tool.name = name
+        return tool
+    
+    def test_results_keep_call_order(self):
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def slow_echo(text):
+            # Both calls must be running at once to get past the barrier
+            barrier.wait()
+            return text.upper()
+        
+        tool = ParallelToolsTool(tools=[self._tool('echo', side_effect=slow_echo)], max_workers=2)
+        results = tool.forward([
+            {'tool': 'echo', 'arguments': {'text': 'first'}},
+            {'tool': 'echo', 'arguments': {'text': 'second'}},
+        ])
+        
+        self.assertEqual(results, ['FIRST', 'SECOND'])
+    
+    def test_single_worker_runs_sequentially(self):
+        echo = self._tool('echo', return_value='ok')
+        tool = ParallelToolsTool(tools=[echo], max_workers=1)
+        
+        with patch('apps.agents.tools.parallel_tools_tool.ThreadPoolExecutor') as mock_executor:
+            results = tool.forward([{'tool': 'echo', 'arguments': {}}] * 3)
+        
+        self.assertEqual(results, ['ok', 'ok', 'ok'])
+        mock_executor.assert_not_called()
+    
+    def test_failing_call_does_not_abort_others(self):
+        tool = ParallelToolsTool(tools=[
+            self._tool('echo', return_value='ok'),
+            self._tool('broken', side_effect=RuntimeError("boom")),
+        ], max_workers=4)
+        
+        results = tool.forward([
+            {'tool': 'broken', 'arguments': {}},
+            {'tool': 'echo'},
+            {'tool': 'missing', 'arguments': {}},
+            {'tool': 'echo', 'arguments': ['not', 'a', 'dict']},
+            'not a call',
+        ])
+        
+        self.assertEqual(results[0], "Error running broken: boom")
+        self.assertEqual(results[1], 'ok')
+        self.assertTrue(results[2].startswith("Error: unknown tool 'missing'"))
+        self.assertEqual(results[3], "Error: arguments for 'echo' must be a dictionary")
+        self.assertTrue(results[4].startswith("Error: invalid call"))
+    
+    def test_invalid_calls_argument(self):
+        tool = ParallelToolsTool(tools=[], max_workers=2)
+        
+        for calls in ([], None, {'tool': 'echo'}):
+            results = tool.forward(calls)
+            self.assertEqual(len(results), 1)
+            self.assertTrue(results[0].startswith("Error: calls must be a non-empty list"))
+    
+    def test_does_not_dispatch_to_itself(self):
+        inner = ParallelToolsTool(tools=[], max_workers=2)
+        tool = ParallelToolsTool(tools=[inner, self._tool('echo')], max_workers=2)
+        
+        self.assertEqual(set(tool.tools_by_name), {'echo'})
+
+
 class TestToolRegistry(BaseTestCase):
     """Test SmolAgents tool registry"""
     
@@ -703,6 +1044,301 @@ class TestChatbotOrchestrator(BaseTestCase):
         self.assertEqual(len(artifacts), 3)
 
 
+class TestExactCache(TestCase):
+    """Test the LRU/TTL result cache"""
+    
+    def test_get_returns_stored_value(self):
+        cache = ExactCache(maxsize=2, ttl=60)
+        key = ExactCache.make_key("prompt", "model", "tools")
+        cache.set(key, {'status': 'success'})
+        
+        self.assertEqual(cache.get(key), {'status': 'success'})
+        self.assertIsNone(cache.get(ExactCache.make_key("prompt", "other-model", "tools")))
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ExactCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')  # 'b' is now the least recently used entry
+        cache.set('c', 3)
+        
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+    
+    @patch('apps.agents.cache.time.monotonic')
+    def test_entry_expires_after_ttl(self, mock_monotonic):
+        cache = ExactCache(maxsize=2, ttl=60)
+        mock_monotonic.return_value = 1000.0
+        cache.set('a', 1)
+        
+        mock_monotonic.return_value = 1060.0
+        self.assertEqual(cache.get('a'), 1)
+        
+        mock_monotonic.return_value = 1060.5
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+@patch('apps.agents.orchestrator._RESULT_CACHE_ENABLED', True)
+class TestOrchestratorResultCache(TestCase):
+    """Test reuse of agent responses for identical requests"""
+    
+    def setUp(self):
+        _RESULT_CACHE.clear()
+        os.makedirs(_TEMP_DIR_ABS, exist_ok=True)
+        self.test_dir = Path(tempfile.mkdtemp(dir=_TEMP_DIR_ABS))
+        self.artifact_path = self.test_dir / "report.xlsx"
+        self.artifact_path.write_bytes(b"data")
+        
+        # Skip __init__: it needs an API key and builds the real agent
+        self.orchestrator = ChatbotOrchestrator.__new__(ChatbotOrchestrator)
+        self.orchestrator.session_id = 'session'
+        self.orchestrator.model = MagicMock(model_id='test-model')
+        self.orchestrator.agent = MagicMock()
+        self.orchestrator.agent.run.return_value = "done"
+        self.orchestrator._tools_signature = 'tools'
+        self.orchestrator._cwd = os.getcwd()
+        self.orchestrator._stat_cache = {}
+        self.response = {
+            'status': 'success',
+            'result': "done",
+            'artifacts': [{'path': str(self.artifact_path), 'name': 'report.xlsx', 'type': 'xlsx'}],
+            'tool_execution_successful': True,
+        }
+    
+    def tearDown(self):
+        _RESULT_CACHE.clear()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _process(self, instruction="Create a report", message=None):
+        with patch.object(self.orchestrator, '_build_prompt', side_effect=lambda text, *args: text), \
+             patch.object(self.orchestrator, '_begin_temp_tracking', return_value=None), \
+             patch.object(self.orchestrator, '_process_agent_result', return_value=self.response), \
+             patch.object(self.orchestrator, '_create_artifact_records') as mock_create_records:
+            result = self.orchestrator.process_request(instruction, {}, 'session', message=message)
+        self.create_records_calls = mock_create_records.call_count
+        return result
+    
+    def test_cache_hit_skips_agent_run(self):
+        first = self._process()
+        second = self._process(message=MagicMock())
+        
+        self.assertEqual(self.orchestrator.agent.run.call_count, 1)
+        self.assertEqual(second['artifacts'], first['artifacts'])
+        # The artifacts stay on the message of the original run
+        self.assertEqual(self.create_records_calls, 0)
+    
+    def test_cache_miss_runs_agent(self):
+        self._process("Create a report")
+        self._process("Create a chart")
+        
+        self.assertEqual(self.orchestrator.agent.run.call_count, 2)
+    
+    def test_cache_disabled_by_setting(self):
+        with patch('apps.agents.orchestrator._RESULT_CACHE_ENABLED', False):
+            self._process()
+            self._process()
+        
+        self.assertEqual(self.orchestrator.agent.run.call_count, 2)
+        self.assertEqual(len(_RESULT_CACHE), 0)
+    
+    @patch('apps.agents.cache.time.monotonic')
+    def test_expired_entry_reruns_agent(self, mock_monotonic):
+        mock_monotonic.return_value = 1000.0
+        self._process()
+        mock_monotonic.return_value = 1000.0 + _RESULT_CACHE.ttl + 1
+        self._process()
+        
+        self.assertEqual(self.orchestrator.agent.run.call_count, 2)
+    
+    def test_deleted_artifact_invalidates_entry(self):
+        self._process()
+        self.artifact_path.unlink()
+        
+        cache_key = self.orchestrator._result_cache_key("Create a report")
+        self.assertIsNone(self.orchestrator._get_cached_result(cache_key))
+        self.assertIsNone(_RESULT_CACHE.get(cache_key))
+        
+        self._process()
+        self.assertEqual(self.orchestrator.agent.run.call_count, 2)
+
+
+class TestArtifactRegistration(BaseTestCase):
+    """Test Artifact record creation for generated files"""
+    
+    def setUp(self):
+        super().setUp()
+        os.makedirs(_TEMP_DIR_ABS, exist_ok=True)
+        self.test_dir = Path(tempfile.mkdtemp(dir=_TEMP_DIR_ABS))
+        self.message = Message.objects.create(
+            conversation=self.conversation,
+            role='assistant',
+            content="Here are your charts"
+        )
+        self.orchestrator = ChatbotOrchestrator.__new__(ChatbotOrchestrator)
+        self.orchestrator._cwd = os.getcwd()
+        self.orchestrator._stat_cache = {}
+    
+    def tearDown(self):
+        super().tearDown()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _artifacts(self, *names):
+        artifacts = []
+        for name in names:
+            path = self.test_dir / name
+            path.write_bytes(b"png data")
+            artifacts.append({'path': str(path), 'name': name})
+        return artifacts
+    
+    def test_artifacts_registered_in_bulk(self):
+        self.orchestrator._create_artifact_records(self._artifacts("a.png", "b.png"), self.message)
+        
+        names = set(Artifact.objects.filter(message=self.message).values_list('file_name', flat=True))
+        self.assertEqual(names, {"a.png", "b.png"})
+        self.assertEqual(self.message.artifacts[-1]['summary']['successfully_registered'], 2)
+    
+    def test_preview_html_taken_from_agent_result(self):
+        agent_result = "Document created: {'success': True, 'preview_html': '<p>Preview</p>'}"
+        
+        self.orchestrator._create_artifact_records(
+            self._artifacts("a.docx", "b.docx"), self.message, agent_result
+        )
+        
+        previews = set(Artifact.objects.filter(message=self.message).values_list('preview_html', flat=True))
+        self.assertEqual(previews, {'<p>Preview</p>'})
+    
+    def test_failed_bulk_insert_registers_valid_rows(self):
+        create = Artifact.objects.create
+        
+        def create_or_fail(**fields):
+            if fields['file_name'] == "bad.png":
+                raise DatabaseError("value too long")
+            return create(**fields)
+        
+        with patch.object(Artifact.objects, 'bulk_create', side_effect=DatabaseError("value too long")), \
+             patch.object(Artifact.objects, 'create', side_effect=create_or_fail):
+            self.orchestrator._create_artifact_records(
+                self._artifacts("a.png", "bad.png", "c.png"), self.message
+            )
+        
+        names = set(Artifact.objects.filter(message=self.message).values_list('file_name', flat=True))
+        self.assertEqual(names, {"a.png", "c.png"})
+        summary = self.message.artifacts[-1]['summary']
+        self.assertEqual(summary['successfully_registered'], 2)
+        self.assertEqual(summary['failed_registration'], 1)
+
+
+class TestArtifactMimeTypes(TestCase):
+    """Test that artifacts get the same content type wherever they are typed"""
+    
+    def test_task_artifacts_use_shared_map(self):
+        for suffix, mime_type in EXT_MIME.items():
+            self.assertEqual(_get_file_type(Path(f"artifact{suffix.upper()}")), mime_type)
+    
+    def test_webp_artifacts(self):
+        self.assertEqual(_get_file_type(Path("chart.webp")), 'image/webp')
+        self.assertEqual(mime_for_suffix('.webp'), 'image/webp')
+    
+    def test_unknown_suffix_falls_back_to_octet_stream(self):
+        self.assertEqual(_get_file_type(Path("data.unknownext")), 'application/octet-stream')
+
+
+@pytest.mark.skipif(not WATCHDOG_AVAILABLE, reason="watchdog is not installed")
+class TestTempDirTracker(TestCase):
+    """Test event-based tracking of generated files"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.existing = os.path.join(self.test_dir, "existing.xlsx")
+        Path(self.existing).write_bytes(b"old")
+        self.tracker = TempDirTracker(self.test_dir, ['.xlsx', '.png'])
+    
+    def tearDown(self):
+        if self.tracker._observer is not None:
+            self.tracker._observer.stop()
+            self.tracker._observer.join()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_end_reports_created_and_modified_files(self):
+        recording = self.tracker.begin()
+        self.assertIsNotNone(recording)
+        
+        created = os.path.join(self.test_dir, "charts", "chart.png")
+        os.makedirs(os.path.dirname(created))
+        Path(created).write_bytes(b"png")
+        Path(self.existing).write_bytes(b"new")
+        files_before, files_after = self.tracker.end(recording)
+        
+        self.assertEqual(set(files_after), {created, self.existing})
+        self.assertEqual(files_before, {self.existing: 0.0})
+    
+    def test_untracked_files_are_ignored(self):
+        recording = self.tracker.begin()
+        Path(self.test_dir, "notes.txt").write_text("text")
+        Path(self.test_dir, ".hidden.png").write_bytes(b"png")
+        files_before, files_after = self.tracker.end(recording)
+        
+        self.assertEqual(files_before, {})
+        self.assertEqual(files_after, {})
+    
+    def test_changes_after_end_are_not_recorded(self):
+        recording = self.tracker.begin()
+        self.tracker.end(recording)
+        Path(self.test_dir, "late.png").write_bytes(b"png")
+        self.tracker._sync()
+        
+        self.assertEqual(recording.paths, {})
+    
+    def test_sync_returns_once_marker_is_seen(self):
+        self.tracker.begin()
+        # With a long timeout, returning quickly means the marker event arrived
+        with patch('apps.agents.temp_tracker._SYNC_TIMEOUT', 30.0):
+            started = time.monotonic()
+            self.tracker._sync()
+        
+        self.assertLess(time.monotonic() - started, 5.0)
+        self.assertEqual(self.tracker._sync_events, {})
+        self.assertEqual(
+            [name for name in os.listdir(self.test_dir) if name.startswith('.tracker-sync-')], []
+        )
+    
+    def test_begin_without_watchdog_returns_none(self):
+        with patch('apps.agents.temp_tracker.WATCHDOG_AVAILABLE', False):
+            tracker = TempDirTracker(self.test_dir, ['.png'])
+        
+        self.assertIsNone(tracker.begin())
+
+
+@pytest.mark.skipif(not WATCHDOG_AVAILABLE, reason="watchdog is not installed")
+class TestAsyncTempTracking(TestCase):
+    """Test that aprocess_request always closes its temp/ recording"""
+    
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.tracker = TempDirTracker(self.test_dir, ['.xlsx'])
+        self.orchestrator = ChatbotOrchestrator.__new__(ChatbotOrchestrator)
+        self.orchestrator._temp_dir = self.test_dir
+    
+    def tearDown(self):
+        if self.tracker._observer is not None:
+            self.tracker._observer.stop()
+            self.tracker._observer.join()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_failed_prompt_discards_recording(self):
+        with patch('apps.agents.orchestrator._TEMP_TRACKER', self.tracker), \
+             patch('apps.agents.orchestrator._TEMP_WATCHER_ENABLED', True), \
+             patch.object(self.orchestrator, '_build_prompt', side_effect=RuntimeError("history unavailable")):
+            result = asyncio.run(self.orchestrator.aprocess_request("Create a report", {}, 'session'))
+        
+        self.assertEqual(result, {'status': 'error', 'error': "history unavailable"})
+        self.assertIsNotNone(self.tracker._observer)
+        self.assertEqual(self.tracker._recordings, set())
+
+
 class TestDocumentSummarizer(BaseTestCase):
     """Test document summarization system"""
     
@@ -764,52 +1400,6 @@ class TestDocumentSummarizer(BaseTestCase):
         self.assertIn('Research Paper', summary)
 
 
-class TestCoreIntegration(BaseTestCase):
-    """Test integration between core components"""
-    
-    def setUp(self):
-        super().setUp()
-        self.test_dir = Path(tempfile.mkdtemp())
-        
-    def tearDown(self):
-        super().tearDown()
-        shutil.rmtree(self.test_dir, ignore_errors=True)
-        plt.close('all')
-    
-    @patch('apps.documents.parsers.excel_parser.pd.ExcelFile')
-    @patch('pandas.read_excel')
-    def test_excel_to_chart_workflow(self, mock_read_excel, mock_excel_file):
-        """Test complete workflow from Excel parsing to chart generation"""
-        # Mock Excel data
-        mock_df = pd.DataFrame({
-            'Month': ['Jan', 'Feb', 'Mar'],
-            'Sales': [100, 150, 120]
-        })
-        
-        mock_file = MagicMock()
-        mock_file.sheet_names = ['Sales Data']
-        mock_excel_file.return_value = mock_file
-        mock_read_excel.return_value = mock_df
-        
-        # Parse Excel
-        test_file = self.test_dir / "sales.xlsx"
-        test_file.touch()
-        
-        excel_content = ExcelParser.parse(str(test_file))
-        
-        # Generate chart from parsed data
-        sales_data = excel_content.sheets['Sales Data']
-        chart_data = {
-            'x': sales_data['Month'].tolist(),
-            'y': sales_data['Sales'].tolist()
-        }
-        
-        chart_path = ChartGenerator.generate_chart(
-            data=chart_data,
-            chart_type='bar',
-            title='Monthly
-
-
 class TestCoreIntegration(BaseTestCase):
     """Test integration between core components"""
     